@@ -1,3 +1,4 @@
+import logging
 import pytz
 import swisseph as swe
 from utils.calculations import calculate_vedic_chart
@@ -52,6 +53,9 @@ def main(test_mode=False):
         print("Please check your inputs and try again.")
 
 if __name__ == "__main__":
+    # Show location details; set_debug_tracing(True) adds the full dasha trace
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Initialize Swiss Ephemeris settings
     swe.set_ephe_path()
     swe.set_sid_mode(swe.SIDM_LAHIRI)  # Lahiri ayanamsa
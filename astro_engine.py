@@ -1,17 +1,15 @@
 import swisseph as swe
 from datetime import datetime
-import geopy
-from geopy.geocoders import Nominatim
 import pytz
+from utils.geo_utils import get_geo_details
 
 # Set ephemeris path to swisseph files (or default)
 swe.set_ephe_path('/usr/share/ephe')  # adjust if needed on your system
 
-# Helper to get lat/lon
+# Helper to get lat/lon (offline gazetteer first, Nominatim as fallback)
 def get_lat_lon(place_name):
-    geolocator = Nominatim(user_agent="vedic_astro_app")
-    location = geolocator.geocode(place_name)
-    return (location.latitude, location.longitude)
+    geo = get_geo_details(place_name)
+    return (geo['lat'], geo['lon'])
 
 # Calculate Lagna and planetary positions
 def calculate_chart(dob, tob, pob):
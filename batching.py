@@ -0,0 +1,62 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class MicroBatcher:
+    """Groups items submitted from many threads into calls of one batch function
+
+    batch_fn takes a list of items and returns one result per item. A batch
+    is flushed when it reaches max_batch items or when the first item in it
+    has waited max_wait_ms. The worker thread starts on the first submit.
+    """
+
+    def __init__(self, batch_fn, max_batch=32, max_wait_ms=5):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, item):
+        """Future of item's result"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                results = self.batch_fn([item for item, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                    continue
+                # Retry one by one so a bad item fails only its own future
+                for item, future in batch:
+                    try:
+                        future.set_result(self.batch_fn([item])[0])
+                    except Exception as e:
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,101 @@
+"""Recall vs latency of the vector_index types against the flat baseline
+
+Uses the corpus embeddings written by `build_vector_store` (the memmapped
+embedding_cache/embeddings.npy, or vectors reconstructed from
+faiss_store/index.faiss). The corpus is grown to `--scale` times its size
+with perturbed copies to preview behaviour at that size. Run from the
+repository root:
+
+    python -m benchmarks.bench_ann_recall --scale 10
+"""
+import argparse
+import os
+import time
+import numpy as np
+import faiss
+import vector_index
+
+CONFIGS = [
+    ("flat", {}),
+    ("hnsw", {"efSearch": 16}),
+    ("hnsw", {"efSearch": 64}),
+    ("hnsw", {"efSearch": 128}),
+    ("ivf_flat", {"nprobe": 4}),
+    ("ivf_flat", {"nprobe": 16}),
+    ("ivf_flat", {"nprobe": 64}),
+    ("ivf_pq", {"nprobe": 16}),
+    ("ivf_pq", {"nprobe": 64}),
+]
+
+
+def load_corpus_embeddings():
+    memmap_path = os.path.join("embedding_cache", "embeddings.npy")
+    if os.path.exists(memmap_path):
+        return np.load(memmap_path), memmap_path
+    index_path = os.path.join("faiss_store", "index.faiss")
+    try:
+        index = faiss.read_index(index_path)
+        return np.vstack([index.reconstruct(i) for i in range(index.ntotal)]), index_path
+    except Exception:
+        pass
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(200, 384))
+    vectors = centers[rng.integers(0, 200, 5000)] + rng.normal(scale=0.6, size=(5000, 384))
+    return vectors, "synthetic (no built vector store found)"
+
+
+def normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def grow(vectors, scale, noise=0.05, seed=1):
+    """Corpus plus (scale - 1) noisy copies, renormalized"""
+    rng = np.random.default_rng(seed)
+    copies = [vectors] + [vectors + rng.normal(scale=noise, size=vectors.shape) for _ in range(scale - 1)]
+    return normalize(np.vstack(copies))
+
+
+def latencies_ms(index, queries, k):
+    times = []
+    for q in queries:
+        start = time.perf_counter()
+        index.search(q[None, :], k)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    corpus, origin = load_corpus_embeddings()
+    vectors = grow(normalize(corpus), args.scale)
+    rng = np.random.default_rng(2)
+    queries = normalize(vectors[rng.choice(len(vectors), args.queries, replace=False)]
+                        + rng.normal(scale=0.05, size=(args.queries, vectors.shape[1])))
+    print(f"Corpus: {origin}, {len(corpus)} vectors x {args.scale} = {len(vectors)}, dim {vectors.shape[1]}")
+
+    faiss.omp_set_num_threads(1)  # per-query latency on one core
+    truth = None
+    built = {}
+    print(f"{'index':<10} {'params':<58} {'build s':>8} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for index_type, search_params in CONFIGS:
+        if index_type not in built:
+            start = time.perf_counter()
+            built[index_type] = vector_index.build_index(vectors, index_type)
+            built[index_type] += (time.perf_counter() - start,)
+        index, params, build_time = built[index_type]
+        params = dict(params, **search_params)
+        vector_index.apply_search_params(index, params)
+
+        _, found = index.search(queries, args.k)
+        if truth is None:
+            truth = found
+        recall = np.mean([len(set(f) & set(t)) / args.k for f, t in zip(found, truth)])
+        p50, p99 = latencies_ms(index, queries, args.k)
+        shown = {key: value for key, value in params.items() if key != "type"}
+        print(f"{index_type:<10} {str(shown):<58} {build_time:8.2f} {recall:10.3f} {p50:8.3f} {p99:8.3f}")
@@ -0,0 +1,53 @@
+"""Micro-benchmark: legacy per-planet ephemeris loop vs utils.ephemeris
+
+Run from the repository root:  python -m benchmarks.bench_ephemeris
+"""
+import time
+import swisseph as swe
+from utils.ephemeris import compute_positions
+
+LEGACY_PLANETS = {
+    'Sun': swe.SUN, 'Moon': swe.MOON, 'Mars': swe.MARS,
+    'Mercury': swe.MERCURY, 'Jupiter': swe.JUPITER, 'Venus': swe.VENUS,
+    'Saturn': swe.SATURN, 'Rahu': swe.MEAN_NODE, 'Ketu': swe.MEAN_NODE
+}
+
+
+def legacy_positions(jd, base_flags=swe.FLG_SWIEPH):
+    """The planet loop calculate_vedic_chart used before utils.ephemeris"""
+    result = {}
+    for name, num in LEGACY_PLANETS.items():
+        flags = base_flags | (swe.FLG_TRUEPOS if name in ['Rahu', 'Ketu'] else 0)
+        pos = swe.calc_ut(jd, num, flags)[0][0]
+        ayanamsa = swe.get_ayanamsa(jd)
+        retrograde = swe.calc_ut(jd, num, flags)[0][3] < 0
+        result[name] = ((pos - ayanamsa) % 360, retrograde)
+    return result
+
+
+def legacy_positions_with_speed(jd):
+    """Legacy loop with FLG_SPEED, the only way its retrograde flag is ever set"""
+    return legacy_positions(jd, swe.FLG_SWIEPH | swe.FLG_SPEED)
+
+
+def bench(func, days):
+    start = time.perf_counter()
+    for jd in days:
+        func(jd)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = 20000
+    days = [2415020.5 + i * 3.7 for i in range(n)]   # spread over ~200 years
+    bench(compute_positions, days[:100])              # warm ephemeris files
+
+    legacy = bench(legacy_positions, days)
+    legacy_speed = bench(legacy_positions_with_speed, days)
+    current = bench(compute_positions, days)
+    print(f"Charts: {n}")
+    print("Calls per chart: legacy 18 calc_ut + 9 get_ayanamsa, new 8 calc_ut + 1 get_ayanamsa")
+    print(f"Legacy loop (no speed, retrograde always False): {legacy / n * 1e6:7.1f} us/chart")
+    print(f"Legacy loop with FLG_SPEED                     : {legacy_speed / n * 1e6:7.1f} us/chart")
+    print(f"compute_positions                              : {current / n * 1e6:7.1f} us/chart")
+    print(f"Speed-up vs legacy: {legacy / current:.2f}x, vs legacy with speed: {legacy_speed / current:.2f}x")
@@ -0,0 +1,117 @@
+"""CPU cost and agreement of the inference backends (torch, int8, onnx)
+
+Embedding: single-text latency, batched throughput and cosine similarity to
+the fp32 torch vectors, plus top-5 retrieval overlap over the sample corpus.
+Generation: single-question latency, batched throughput and the share of
+answers identical to fp32 torch. Backends whose packages are missing are
+skipped. Run from the repository root:
+
+    python -m benchmarks.bench_inference --backends torch int8 onnx
+"""
+import argparse
+import os
+import time
+import numpy as np
+import inference_backend
+import qa_model
+from chunk_store import ChunkStore
+
+EMBED_MODEL = "all-MiniLM-L6-v2"
+
+QUESTIONS = [
+    "What results does Jupiter in the fifth house give?",
+    "How is the strength of the lagna lord judged?",
+    "What is the effect of Saturn aspecting the Moon?",
+    "Which yoga is formed by Jupiter in a kendra from the Moon?",
+    "How does Rahu in the seventh house affect marriage?",
+    "When does the Mahadasha of a debilitated planet give good results?",
+    "What does the second house signify?",
+    "How is longevity estimated from the eighth house?",
+]
+
+
+def sample_texts(n):
+    store_dir = os.path.join("faiss_store", "chunks")
+    if os.path.exists(store_dir):
+        store = ChunkStore(store_dir)
+        step = max(1, len(store) // n)
+        return [store.chunk_text(i) for i in range(0, len(store), step)][:n], store_dir
+    return [q * 4 for q in QUESTIONS] * (n // len(QUESTIONS)), "repeated questions (no chunk store found)"
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_embedder(backend, texts, reference):
+    embedder = inference_backend.load_embedder(EMBED_MODEL, backend)
+    embedder.encode(texts[:8], normalize_embeddings=True)  # warm up
+    singles = [timed(embedder.encode, [t], normalize_embeddings=True)[1] for t in texts[:50]]
+    vectors, elapsed = timed(embedder.encode, texts, batch_size=64, normalize_embeddings=True)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    row = {"p50 ms": np.median(singles) * 1000, "texts/s": len(texts) / elapsed}
+    if reference is not None:
+        cosine = np.sum(vectors * reference, axis=1)
+        top_ref = np.argsort(-reference[:50] @ reference.T, axis=1)[:, :5]
+        top = np.argsort(-vectors[:50] @ vectors.T, axis=1)[:, :5]
+        row.update({"mean cos": cosine.mean(), "min cos": cosine.min(),
+                    "top5 overlap": np.mean([len(set(a) & set(b)) / 5 for a, b in zip(top, top_ref)])})
+    return row, vectors
+
+
+def bench_generator(backend, reference):
+    qa = inference_backend.load_text2text_pipeline(qa_model.MODEL_NAME, backend)
+
+    def generate(prompts, batch_size):
+        return [r["generated_text"] for r in qa(prompts, max_length=qa_model.MAX_LENGTH,
+                                                truncation=True, batch_size=batch_size)]
+
+    generate(QUESTIONS[:1], 1)  # warm up
+    singles = [timed(generate, [q], 1)[1] for q in QUESTIONS]
+    answers, elapsed = timed(generate, QUESTIONS, len(QUESTIONS))
+    row = {"p50 ms": np.median(singles) * 1000, "questions/s": len(QUESTIONS) / elapsed}
+    if reference is not None:
+        row["same answer"] = np.mean([a == b for a, b in zip(answers, reference)])
+    return row, answers
+
+
+def print_row(backend, row):
+    print(f"  {backend:<6} " + "  ".join(f"{key} {value:.3f}" for key, value in row.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=list(inference_backend.BACKENDS))
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--skip-generation", action="store_true")
+    args = parser.parse_args()
+
+    import torch
+    print(f"torch threads: {torch.get_num_threads()}")
+
+    texts, origin = sample_texts(args.texts)
+    print(f"\nEmbedding {len(texts)} texts from {origin}")
+    reference = None
+    for backend in ["torch"] + [b for b in args.backends if b != "torch"]:
+        try:
+            row, vectors = bench_embedder(backend, texts, reference)
+        except ImportError as e:
+            print(f"  {backend:<6} skipped: {e}")
+            continue
+        reference = vectors if reference is None else reference
+        print_row(backend, row)
+
+    if args.skip_generation:
+        raise SystemExit
+    print(f"\nGenerating answers to {len(QUESTIONS)} questions with {qa_model.MODEL_NAME}")
+    reference = None
+    for backend in ["torch"] + [b for b in args.backends if b != "torch"]:
+        try:
+            row, answers = bench_generator(backend, reference)
+        except ImportError as e:
+            print(f"  {backend:<6} skipped: {e}")
+            continue
+        reference = answers if reference is None else reference
+        print_row(backend, row)
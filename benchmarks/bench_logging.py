@@ -0,0 +1,40 @@
+"""Benchmark: dasha calculation with the debug trace on vs off
+
+The trace-on run sends every message to stdout, as the old unconditional
+print() calls did. Run from the repository root with stdout redirected so
+terminal speed does not dominate:
+
+    python -m benchmarks.bench_logging > /dev/null
+"""
+import logging
+import sys
+import time
+from datetime import datetime
+import pytz
+from utils import set_debug_tracing
+from utils.dasha_calculator import calculate_vimshottari_dasha
+
+
+def bench(n):
+    birth_dt = pytz.utc.localize(datetime(1984, 1, 14, 10, 15))
+    start = time.perf_counter()
+    for i in range(n):
+        calculate_vimshottari_dasha(birth_dt, (i * 7.3) % 360)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = 2000
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.getLogger().addHandler(handler)
+
+    set_debug_tracing(True)
+    traced = bench(n)
+    set_debug_tracing(False)
+    quiet = bench(n)
+
+    sys.stderr.write(f"Charts: {n}\n")
+    sys.stderr.write(f"Trace to stdout: {traced / n * 1e6:8.1f} us/chart\n")
+    sys.stderr.write(f"Trace disabled : {quiet / n * 1e6:8.1f} us/chart\n")
+    sys.stderr.write(f"Speed-up: {traced / quiet:.1f}x\n")
@@ -1,13 +1,26 @@
 import os
+import sys
+import shutil
+from collections import defaultdict
 import load_documents
-from sentence_transformers import SentenceTransformer
+import embeddings as embedding_store
+import vector_index
+import chunk_store
+import chunking
+import placement_index
+import inference_backend
 import time
-from tqdm import tqdm
-import numpy as np
 import faiss
 import pickle
 
-def build_vector_store():
+EMBED_BATCH_SIZE = 64
+EMBED_WORKERS = 1  # > 1 spreads embedding over that many CPU processes
+
+def build_vector_store(batch_size=EMBED_BATCH_SIZE, workers=EMBED_WORKERS,
+                       use_embedding_cache=True, memmap_embeddings=False,
+                       index_type="flat", index_params=None,
+                       chunk_tokens=chunking.CHUNK_TOKENS, chunk_overlap=chunking.CHUNK_OVERLAP,
+                       dedup_threshold=0.8, backend=None):
     print("\n=== Starting Vector Store Creation with FAISS ===")
     
     # 1. Document Loading
@@ -27,55 +40,24 @@ def build_vector_store():
     for i, pdf_file in enumerate(pdf_files, 1):
         print(f"  {i}. {pdf_file}")
 
-    # Load documents with metadata tracking
-    documents = []
-    for pdf_file in tqdm(pdf_files, desc="Processing PDFs"):
-        try:
-            file_path = os.path.join(folder_path, pdf_file)
-            text = load_documents.load_pdf(file_path)  # Assuming you have this function
-            documents.append({
-                "text": text,
-                "source": pdf_file,
-                "pages": "all"  # Or track specific pages if needed
-            })
-        except Exception as e:
-            print(f"⚠️ Error loading {pdf_file}: {str(e)}")
-            continue
-
-    if not documents:
+    # Extract pages in parallel; unchanged PDFs come from the page cache
+    ingested = load_documents.ingest_folder(folder_path)
+    reused = sum(1 for doc in ingested if doc["cached"])
+    print(f"Page cache: {reused} reused, {len(ingested) - reused} extracted")
+
+    if not ingested:
         print("❌ No documents were successfully loaded")
         return
-    
-    combined_text = "\n\n".join([doc["text"] for doc in documents])
-    print(f"✓ Loaded {len(documents)} PDFs with {len(combined_text)} total characters")
-
-    # 2. Text Chunking with metadata preservation
-    print("\n[2/5] Creating text chunks...")
-    chunk_size = 500
-    chunks = []
-    chunk_metadata = []
-    
-    for doc in documents:
-        text = doc["text"]
-        source = doc["source"]
-        for i in range(0, len(text), chunk_size):
-            chunk = text[i:i+chunk_size]
-            chunks.append(chunk)
-            chunk_metadata.append({
-                "source": source,
-                "chunk_id": f"{source}_chunk_{len(chunks)}",
-                "page_range": doc.get("pages", "all")
-            })
-    
-    print(f"✓ Created {len(chunks)} chunks ({chunk_size} chars each)")
-    print(f"Sample chunk metadata: {chunk_metadata[0]}")
+    total_pages = sum(doc["page_count"] for doc in ingested)
+    print(f"✓ Loaded {len(ingested)} PDFs with {total_pages} pages of text")
 
-    # 3. Initialize Embedding Model
-    print("\n[3/5] Loading embedding model...")
+    # 2. Initialize Embedding Model
+    print("\n[2/5] Loading embedding model...")
     model_name = 'all-MiniLM-L6-v2'
     try:
-        embedder = SentenceTransformer(model_name)
-        print(f"✓ Model '{model_name}' loaded")
+        backend = inference_backend.resolve_backend(backend)
+        embedder = inference_backend.load_embedder(model_name, backend)
+        print(f"✓ Model '{model_name}' loaded ({backend} backend)")
         test_embedding = embedder.encode("test")
         embedding_dim = len(test_embedding)
         print(f"Vector dimension: {embedding_dim}")
@@ -83,70 +65,117 @@ def build_vector_store():
         print(f"❌ Failed to load model: {e}")
         return
 
+    # 3. One pass over the pages: sentence-aligned chunks within the embedder's
+    # token limit go to the chunk store and the placement index as they are
+    # embedded, so no corpus-sized list of chunks is ever built
+    print("\n[3/5] Chunking, indexing placements and embedding...")
+    chunk_tokens = min(chunk_tokens, embedder.max_seq_length - 2)  # room for [CLS]/[SEP]
+    count_tokens = lambda text: len(embedder.tokenizer.tokenize(text))
+    dedup = chunking.NearDuplicateFilter(dedup_threshold) if dedup_threshold else None
+
+    # The store is written to a staging directory and swapped in whole, so a
+    # running retrieval service never sees its mapped files change
+    save_dir = "faiss_store"
+    staging = chunk_store.staging_directory(save_dir)
+    writer = chunk_store.ChunkStoreWriter(os.path.join(staging, chunk_store.CHUNK_STORE_DIR))
+    placements = defaultdict(list)  # chart placement (planet x sign/house/strength) -> chunk ids
+
+    def discard():
+        writer.discard()
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def stream_chunks():
+        for chunk, source, first_page, last_page in chunking.iter_chunks(
+                load_documents.iter_cached_pages(ingested), chunk_tokens, chunk_overlap, count_tokens, dedup):
+            chunk_id = writer.add(chunk, source, first_page, last_page)
+            placement_index.add_placements(placements, chunk_id, chunk)
+            yield chunk
+
+    cache = embedding_store.EmbeddingCache() if use_embedding_cache else None
+    try:
+        # Embeddings in batches, reusing cached vectors
+        print(f"Generating embeddings (batch size {batch_size}, {workers} worker(s))...")
+        out_path = os.path.join("embedding_cache", "embeddings.npy") if memmap_embeddings else None
+        embeddings, embedded = embedding_store.embed_texts(
+            stream_chunks(), embedder, inference_backend.embedding_model_id(model_name, backend),
+            batch_size=batch_size, workers=workers, cache=cache, out_path=out_path)
+    except Exception as e:
+        print(f"❌ Failed to embed chunks: {e}")
+        discard()
+        return
+    finally:
+        if cache is not None:
+            cache.close()
+
+    num_chunks = len(writer)
+    if not num_chunks:
+        print("❌ No text chunks were created")
+        discard()
+        return
+    print(f"✓ Created {num_chunks} chunks (<= {chunk_tokens} tokens, {chunk_overlap} overlap)")
+    if dedup:
+        print(f"Skipped {dedup.duplicates} near-duplicate chunks")
+    print(f"✓ Embedded {embedded} new chunks, {num_chunks - embedded} from cache")
+    print(f"✓ {len(placements)} placement keys over "
+          f"{len({i for ids in placements.values() for i in ids})} chunks")
+
     # 4. Create FAISS Index
     print("\n[4/5] Creating FAISS index...")
     try:
-        # Create FlatIP index with ID mapping
-        index = faiss.IndexFlatIP(embedding_dim)
-        index = faiss.IndexIDMap2(index)
-        
-        # Generate embeddings with progress tracking
-        print("Generating embeddings...")
-        embeddings = []
-        for i, chunk in enumerate(tqdm(chunks, desc="Processing chunks")):
-            embedding = embedder.encode(chunk, normalize_embeddings=True)
-            embeddings.append(embedding)
-        
-        # Convert to numpy array
-        embeddings = np.array(embeddings).astype('float32')
-        
-        # Add to index with IDs
-        ids = np.arange(len(chunks)).astype('int64')
-        index.add_with_ids(embeddings, ids)
+        # Build the selected index type (trained on a sample for IVF) with ID mapping
+        index, index_params = vector_index.build_index(embeddings, index_type, index_params)
+        print(f"Index type: {index_type} {index_params}")
         
         print(f"✓ FAISS index created with {index.ntotal} vectors")
     except Exception as e:
         print(f"❌ Failed to create FAISS index: {e}")
+        discard()
         return
 
     # 5. Save FAISS Index and Metadata
     print("\n[5/5] Saving vector store...")
-    save_dir = "faiss_store"
-    os.makedirs(save_dir, exist_ok=True)
-    
     try:
         # Save FAISS index
-        faiss.write_index(index, os.path.join(save_dir, "index.faiss"))
+        faiss.write_index(index, os.path.join(staging, "index.faiss"))
         
-        # Save metadata with chunk mapping
+        # Chunk texts and page columns are already in the memory-mapped chunk store
+        writer.close()
+        placement_index.save_placement_index(placements, staging)
+
+        # metadata.pkl only describes the store; FAISS id i is chunk i
         metadata = {
-            "chunks": chunks,
-            "metadata": chunk_metadata,
-            "document_sources": [doc["source"] for doc in documents],
+            "chunk_store": chunk_store.CHUNK_STORE_DIR,
+            "num_chunks": num_chunks,
+            "document_sources": [doc["source"] for doc in ingested],
             "embedding_model": model_name,
+            "embedding_backend": backend,
+            "index": index_params,
+            "chunking": {"max_tokens": chunk_tokens, "overlap": chunk_overlap, "dedup_threshold": dedup_threshold},
             "creation_time": time.strftime("%Y-%m-%d %H:%M:%S")
         }
         
-        with open(os.path.join(save_dir, "metadata.pkl"), "wb") as f:
+        with open(os.path.join(staging, "metadata.pkl"), "wb") as f:
             pickle.dump(metadata, f)
+        chunk_store.replace_directory(staging, save_dir)
         
         print(f"✓ Vector store saved to {save_dir}")
     except Exception as e:
         print(f"❌ Failed to save vector store: {e}")
+        shutil.rmtree(staging, ignore_errors=True)
         return
 
     # Results Summary
     print("\n=== Results ===")
-    print(f"Total PDFs processed: {len(documents)}")
-    print(f"Total chunks created: {len(chunks)}")
+    print(f"Total PDFs processed: {len(ingested)}")
+    print(f"Total chunks created: {num_chunks}")
     print(f"Vector dimension: {embedding_dim}")
     print(f"Index size: {index.ntotal} vectors")
     
     print("\n✅ FAISS vector store created successfully!")
 
     return {
-        "documents_processed": len(documents),
-        "total_chunks": len(chunks),
+        "documents_processed": len(ingested),
+        "total_chunks": num_chunks,
         "embedding_dim": embedding_dim,
         "index_size": index.ntotal,
         "storage_path": save_dir
@@ -156,7 +185,9 @@ if __name__ == "__main__":
     start_time = time.time()
     print("Starting FAISS vector store creation...")
     
-    result = build_vector_store()
+    # Optional index type: flat (default), hnsw, ivf_flat or ivf_pq
+    index_type = sys.argv[1] if len(sys.argv) > 1 else "flat"
+    result = build_vector_store(index_type=index_type)
     
     total_time = time.time() - start_time
     print(f"\nTotal execution time: {total_time:.2f} seconds")
\ No newline at end of file
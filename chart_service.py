@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+import pytz
+import swisseph as swe
+from utils.calculations import calculate_vedic_chart
+from utils.chart_plotter import render_vedic_chart
+from utils.dasha_timeline import period_to_dict, datetime_to_jd, CYCLE_DAYS
+from utils.geo_utils import get_geo_details
+from utils.astro_constants import SIGN_NAMES
+
+logger = logging.getLogger(__name__)
+
+HOST, PORT = "127.0.0.1", 8766
+CHART_WORKERS = os.cpu_count() or 1
+GEO_WORKERS = 8
+MAX_PENDING = 256  # chart jobs queued or running before requests get 503
+
+ROUTES = {"/chart": "chart", "/dashas": "dashas", "/chart.png": "png"}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+def init_ephemeris():
+    """Swiss Ephemeris settings of app.py, applied in every worker"""
+    swe.set_ephe_path()
+    swe.set_sid_mode(swe.SIDM_LAHIRI)  # Lahiri ayanamsa
+
+def chart_to_json(chart):
+    return {
+        "datetime": chart["datetime"],
+        "geo": chart["geo"],
+        "lagna": dict(chart["lagna"], sign_name=SIGN_NAMES[chart["lagna"]["sign"] - 1]),
+        "planets": {name: dict(data, sign_name=SIGN_NAMES[data["sign"] - 1])
+                    for name, data in chart["planets"].items()},
+        "houses": list(chart["houses"]),
+    }
+
+def _period_json(period):
+    data = period_to_dict(period)
+    data["start"] = data["start"].isoformat()
+    data["end"] = data["end"].isoformat()
+    return data
+
+def dashas_to_json(chart, depth=3, at=None):
+    """Periods running at `at` (default now) and the Mahadashas of one 120-year cycle"""
+    timeline = chart["dasha_timeline"]
+    at = at or datetime.now(pytz.utc)
+    return {
+        "at": at.isoformat(),
+        "current": [_period_json(p) for p in timeline.periods_at(datetime_to_jd(at), depth)],
+        "mahadashas": [_period_json(p) for p in
+                       timeline.mahadashas(timeline.birth_jd, timeline.birth_jd + CYCLE_DAYS)],
+    }
+
+def run_job(kind, dob, tob, pob, geo, depth=3, at=None):
+    """Blocking chart work for one request with pob already resolved to geo; returns (content type, body bytes)"""
+    chart = calculate_vedic_chart(dob, tob, pob, geo=geo)
+    if kind == "png":
+        return "image/png", render_vedic_chart(chart)
+    payload = chart_to_json(chart) if kind == "chart" else dashas_to_json(chart, depth, at)
+    return "application/json", json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+class Overloaded(Exception):
+    pass
+
+class ChartService:
+    """asyncio HTTP front end for chart, dasha and chart image requests
+
+    Geocoding runs on its own thread pool and the resolved place is handed
+    to the chart job, so slow online lookups never hold a chart worker.
+    Chart work runs on `workers` threads, or processes with
+    use_processes=True (pyswisseph holds the GIL, so only processes compute
+    in parallel). Requests for the same birth instant and resolved place
+    share one job while it is in flight. Past max_pending geocodes or
+    max_pending chart jobs new requests get 503 with Retry-After instead of
+    queueing without bound.
+    """
+
+    def __init__(self, workers=CHART_WORKERS, use_processes=False, geo_workers=GEO_WORKERS,
+                 max_pending=MAX_PENDING):
+        init_ephemeris()
+        pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self.pool = pool_class(workers, initializer=init_ephemeris)
+        self.geo_pool = ThreadPoolExecutor(geo_workers)
+        self.max_pending = max_pending
+        self.pending = 0
+        self.geo_pending = 0
+        self.in_flight = {}
+        self.stats = {"requests": 0, "jobs": 0, "coalesced": 0, "geocodes_coalesced": 0, "rejected": 0}
+
+    async def _coalesced(self, key, start, stat="coalesced"):
+        """Await the in-flight future for key, or create it with start()"""
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.stats[stat] += 1
+            return await asyncio.shield(future)
+        future = asyncio.ensure_future(start())
+        self.in_flight[key] = future
+        future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _run_geocode(self, pob):
+        if self.geo_pending >= self.max_pending:
+            self.stats["rejected"] += 1
+            raise Overloaded()
+        self.geo_pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.geo_pool, get_geo_details, pob)
+        finally:
+            self.geo_pending -= 1
+
+    async def geocode(self, pob):
+        return await self._coalesced(("geo", pob.strip().lower()), lambda: self._run_geocode(pob),
+                                     "geocodes_coalesced")
+
+    async def _run_job(self, *args):
+        if self.pending >= self.max_pending:
+            self.stats["rejected"] += 1
+            raise Overloaded()
+        self.pending += 1
+        self.stats["jobs"] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, run_job, *args)
+        finally:
+            self.pending -= 1
+
+    async def handle(self, kind, params):
+        dob, tob, pob = (params.get(name, [""])[0].strip() for name in ("dob", "tob", "pob"))
+        if not (dob and tob and pob):
+            return 400, {"error": "dob (DD-MM-YYYY), tob (HH:MM AM/PM) and pob are required"}
+        try:
+            depth = min(max(int(params.get("depth", ["3"])[0]), 1), 5)
+            at = params.get("at", [None])[0]
+            at = pytz.utc.localize(datetime.strptime(at, "%d-%m-%Y")) if at else None
+            birth = datetime.strptime(f"{dob} {tob}", "%d-%m-%Y %I:%M %p")
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+        try:
+            geo = await self.geocode(pob)
+        except Overloaded:
+            return 503, {"error": "too many place lookups in progress, retry shortly"}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+        # Spellings of the same place resolve to the same coordinates and share a job
+        key = (kind, birth, geo["lat"], geo["lon"], geo["tz"], depth, at)
+        try:
+            return 200, await self._coalesced(key, lambda: self._run_job(kind, dob, tob, pob, geo, depth, at))
+        except Overloaded:
+            return 503, {"error": "too many chart requests in progress, retry shortly"}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+    async def dispatch(self, method, target):
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, dict(self.stats, pending=self.pending, geo_pending=self.geo_pending, in_flight=len(self.in_flight))
+        if url.path not in ROUTES:
+            return 404, {"error": "not found"}
+        if method != "GET":
+            return 405, {"error": "only GET is supported"}
+        self.stats["requests"] += 1
+        try:
+            return await self.handle(ROUTES[url.path], parse_qs(url.query))
+        except Exception:
+            logger.exception("Request failed: %s", target)
+            return 500, {"error": "internal error"}
+
+    async def handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1 with keep-alive; every request is a GET without a body"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    status, result = 400, {"error": "malformed request line"}
+                    parts = ["", "", "HTTP/1.0"]
+                else:
+                    status, result = await self.dispatch(parts[0], parts[1])
+
+                if isinstance(result, tuple):
+                    content_type, body = result
+                else:
+                    content_type, body = "application/json", json.dumps(result).encode("utf-8")
+                keep_alive = parts[2] == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                head = [f"HTTP/1.1 {status} {REASONS[status]}",
+                        f"Content-Type: {content_type}",
+                        f"Content-Length: {len(body)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                if status == 503:
+                    head.append("Retry-After: 1")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        print(f"Serving charts on http://{host}:{port} (/chart, /dashas, /chart.png)")
+        async with server:
+            await server.serve_forever()
+
+if __name__ == "__main__":
+    # python chart_service.py [workers] [--processes]
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    service = ChartService(workers=int(args[0]) if args else CHART_WORKERS,
+                           use_processes="--processes" in sys.argv)
+    asyncio.run(service.serve())
@@ -0,0 +1,134 @@
+import os
+import json
+import shutil
+import time
+from array import array
+import numpy as np
+
+CHUNK_STORE_DIR = "chunks"
+
+# Files of a chunk store directory
+TEXT_FILE = "text.bin"        # all chunk texts, UTF-8, back to back
+OFFSETS_FILE = "offsets.npy"  # int64 (n + 1,), chunk i is text[offsets[i]:offsets[i + 1]]
+SOURCE_FILE = "source.npy"    # int32 (n,), index into sources.json
+PAGES_FILE = "pages.npy"      # int32 (n, 2), first and last page
+SOURCES_FILE = "sources.json"
+
+def staging_directory(directory):
+    """Empty sibling directory to write a new version of directory into"""
+    staging = f"{os.path.normpath(directory)}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    return staging
+
+def replace_directory(staging, directory):
+    """Swap a fully written staging directory in for directory
+
+    Files are never rewritten in place: the old directory is renamed aside
+    and removed, so processes that have its files mapped keep reading the
+    old version until they reopen the new one.
+    """
+    directory = os.path.normpath(directory)
+    old = None
+    if os.path.exists(directory):
+        old = f"{directory}.old-{os.getpid()}-{time.time_ns()}"
+        os.rename(directory, old)
+    os.rename(staging, directory)
+    if old:
+        shutil.rmtree(old, ignore_errors=True)
+
+class ChunkStoreWriter:
+    """Builds a chunk store one chunk at a time
+
+    Texts are appended to text.bin as they arrive; only the offsets and the
+    source/page columns are kept in memory. Everything is written to a
+    staging directory that close() swaps in for directory.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.staging = staging_directory(directory)
+        self.text = open(os.path.join(self.staging, TEXT_FILE), "wb")
+        self.offsets = array("q", [0])
+        self.source_ids = array("i")
+        self.pages = array("i")
+        self.source_names = {}
+
+    def __len__(self):
+        return len(self.source_ids)
+
+    def add(self, chunk, source, first_page, last_page):
+        """Append one chunk and return its id"""
+        data = chunk.encode("utf-8")
+        self.text.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+        self.source_ids.append(self.source_names.setdefault(source, len(self.source_names)))
+        self.pages.extend((first_page, last_page))
+        return len(self) - 1
+
+    def close(self):
+        self.text.close()
+        np.save(os.path.join(self.staging, OFFSETS_FILE), np.frombuffer(self.offsets, dtype=np.int64))
+        np.save(os.path.join(self.staging, SOURCE_FILE), np.frombuffer(self.source_ids, dtype=np.int32))
+        np.save(os.path.join(self.staging, PAGES_FILE), np.frombuffer(self.pages, dtype=np.int32).reshape(-1, 2))
+        with open(os.path.join(self.staging, SOURCES_FILE), "w", encoding="utf-8") as f:
+            json.dump(list(self.source_names), f, ensure_ascii=False)
+        replace_directory(self.staging, self.directory)
+
+    def discard(self):
+        """Drop a partly written store, leaving directory as it was"""
+        self.text.close()
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+def write_chunk_store(directory, chunks, sources, first_pages, last_pages):
+    """Write chunk texts and their source/page columns to directory, replacing any old store"""
+    writer = ChunkStoreWriter(directory)
+    for chunk, source, first_page, last_page in zip(chunks, sources, first_pages, last_pages):
+        writer.add(chunk, source, first_page, last_page)
+    writer.close()
+
+class ChunkStore:
+    """Read-only, memory-mapped view of a chunk store written by write_chunk_store
+
+    Nothing is loaded up front; looking up a chunk touches only its own
+    bytes, and processes opening the same store share the page cache.
+    """
+
+    def __init__(self, directory):
+        self.offsets = np.load(os.path.join(directory, OFFSETS_FILE), mmap_mode="r")
+        self.source_ids = np.load(os.path.join(directory, SOURCE_FILE), mmap_mode="r")
+        self.pages = np.load(os.path.join(directory, PAGES_FILE), mmap_mode="r")
+        with open(os.path.join(directory, SOURCES_FILE), encoding="utf-8") as f:
+            self.sources = json.load(f)
+        text_path = os.path.join(directory, TEXT_FILE)
+        # np.memmap cannot map an empty file
+        if os.path.getsize(text_path):
+            self.text = np.memmap(text_path, dtype=np.uint8, mode="r")
+        else:
+            self.text = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.chunk_text(i)
+
+    def chunk_bytes(self, i):
+        """UTF-8 bytes of chunk i as a memoryview into the mapped file"""
+        return memoryview(self.text[self.offsets[i]:self.offsets[i + 1]])
+
+    def chunk_text(self, i):
+        return str(self.chunk_bytes(i), "utf-8")
+
+    def source(self, i):
+        return self.sources[self.source_ids[i]]
+
+    def chunk_metadata(self, i):
+        """Metadata dict of chunk i, as build_vector_store used to pickle it"""
+        source = self.source(i)
+        first_page, last_page = self.pages[i]
+        return {
+            "source": source,
+            "chunk_id": f"{source}_chunk_{i + 1}",
+            "page_range": f"{first_page}-{last_page}"
+        }
@@ -0,0 +1,188 @@
+import re
+import zlib
+from collections import Counter
+import numpy as np
+
+CHUNK_TOKENS = 200
+CHUNK_OVERLAP = 40
+
+# Lines seen at the top or bottom of this share of a document's pages
+# (and at least BOILERPLATE_MIN_PAGES of them) are running headers/footers
+BOILERPLATE_SHARE = 0.05
+BOILERPLATE_MIN_PAGES = 3
+EDGE_LINES = 2
+
+SENTENCE_END = re.compile(r'(?<=[.!?।॥])["\')\]]*\s+(?=["\'(\[]?[A-Z0-9])')
+TERMINAL = ('.', '!', '?', '।', '॥', '"', "'", ')')
+
+def approx_token_count(text):
+    """Word and punctuation count, a lower bound on word-piece tokens"""
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+def _line_key(line):
+    return re.sub(r'\d+', '#', " ".join(line.split()))
+
+def boilerplate_lines(pages):
+    """Normalized header/footer lines repeated across the pages of one document"""
+    counts = Counter()
+    for text in pages:
+        lines = [line for line in text.splitlines() if line.strip()]
+        counts.update({_line_key(line) for line in lines[:EDGE_LINES] + lines[-EDGE_LINES:]})
+    min_pages = max(BOILERPLATE_MIN_PAGES, BOILERPLATE_SHARE * len(pages))
+    return {key for key, n in counts.items() if n >= min_pages}
+
+def clean_page(text, boilerplate):
+    """Page text with boilerplate and bare page-number lines removed, lines unwrapped"""
+    lines = []
+    for line in text.splitlines():
+        key = _line_key(line)
+        if not key or key in boilerplate or re.fullmatch(r'[#ivxlc\s.\-–]*', key, re.IGNORECASE):
+            continue
+        lines.append(line)
+    return " ".join(" ".join(lines).split())
+
+def split_sentences(text):
+    return [s for s in SENTENCE_END.split(text) if s.strip()]
+
+def _split_long(sentence, max_tokens, count_tokens):
+    """Word-boundary pieces of a sentence longer than max_tokens"""
+    piece, size = [], 0
+    for word in sentence.split():
+        n = count_tokens(word)
+        if piece and size + n > max_tokens:
+            yield " ".join(piece), size
+            piece, size = [], 0
+        piece.append(word)
+        size += n
+    if piece:
+        yield " ".join(piece), size
+
+def _sentence_units(sentence, max_tokens, count_tokens):
+    n = count_tokens(sentence)
+    if n <= max_tokens:
+        return [(sentence, n)]
+    return list(_split_long(sentence, max_tokens, count_tokens))
+
+def _document_units(pages, max_tokens, count_tokens):
+    """(text, first_page, last_page, tokens) sentence units of one document
+
+    A sentence running over a page break becomes one unit spanning both pages.
+    """
+    boilerplate = boilerplate_lines([text for _, text in pages])
+    carry = None  # unfinished sentence from the previous page: (text, first_page)
+    for page_no, text in pages:
+        sentences = split_sentences(clean_page(text, boilerplate))
+        if not sentences:
+            continue
+        first_pages = [page_no] * len(sentences)
+        if carry:
+            sentences[0] = carry[0] + " " + sentences[0]
+            first_pages[0] = carry[1]
+            carry = None
+        if not sentences[-1].endswith(TERMINAL):
+            carry = (sentences.pop(), first_pages.pop())
+        for sentence, first_page in zip(sentences, first_pages):
+            for piece, n in _sentence_units(sentence, max_tokens, count_tokens):
+                yield piece, first_page, page_no, n
+    if carry:
+        for piece, n in _sentence_units(carry[0], max_tokens, count_tokens):
+            yield piece, carry[1], page_no, n
+
+def _pack(units, max_tokens, overlap):
+    """Greedy packing of sentence units into chunks of at most max_tokens
+
+    A chunk ending at least half full is closed at a page boundary when the
+    next page would not fit whole. Each new chunk starts with the trailing
+    units of the previous one, up to `overlap` tokens.
+    """
+    page_tokens = Counter()
+    for _, first_page, _, n in units:
+        page_tokens[first_page] += n
+
+    current, size, fresh = [], 0, 0
+    for unit in units:
+        _, first_page, _, n = unit
+        new_page = current and first_page != current[-1][2]
+        if current and (size + n > max_tokens or
+                        (new_page and size >= max_tokens // 2 and size + page_tokens[first_page] > max_tokens)):
+            if fresh:
+                yield current
+            tail, tail_size = [], 0
+            for prev in reversed(current):
+                if tail_size + prev[3] > overlap:
+                    break
+                tail.insert(0, prev)
+                tail_size += prev[3]
+            if tail_size + n > max_tokens:
+                tail, tail_size = [], 0
+            current, size, fresh = tail, tail_size, 0
+        current.append(unit)
+        size += n
+        fresh += 1
+    if fresh:
+        yield current
+
+class NearDuplicateFilter:
+    """MinHash/LSH filter remembering every chunk it has accepted
+
+    is_duplicate(text) is True when an accepted chunk has an estimated
+    Jaccard similarity of word shingles >= threshold.
+    """
+
+    PRIME = (1 << 61) - 1
+
+    def __init__(self, threshold=0.8, num_perm=64, bands=16, shingle=5, seed=1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle = shingle
+        self.signatures = []
+        self.buckets = {}
+        self.duplicates = 0
+
+    def signature(self, text):
+        words = re.findall(r"\w+", text.lower())
+        shingles = {" ".join(words[i:i + self.shingle]) for i in range(max(1, len(words) - self.shingle + 1))}
+        hashes = np.array([zlib.crc32(s.encode("utf-8")) for s in shingles], dtype=np.uint64)
+        return ((np.outer(hashes, self.a) + self.b) % self.PRIME).min(axis=0)
+
+    def is_duplicate(self, text):
+        sig = self.signature(text)
+        keys = [(band, sig[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+        candidates = {i for key in keys for i in self.buckets.get(key, ())}
+        if any(np.mean(self.signatures[i] == sig) >= self.threshold for i in candidates):
+            self.duplicates += 1
+            return True
+        for key in keys:
+            self.buckets.setdefault(key, []).append(len(self.signatures))
+        self.signatures.append(sig)
+        return False
+
+def iter_chunks(pages, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP, count_tokens=approx_token_count,
+                dedup=None):
+    """Sentence-aligned chunks from a (source, page_no, text) stream
+
+    Pages are buffered one document at a time to find its repeated
+    headers. Chunks of near-duplicate text are skipped when a
+    NearDuplicateFilter is given. Yields (chunk_text, source, first_page, last_page).
+    """
+    def document_chunks(source, doc_pages):
+        units = list(_document_units(doc_pages, max_tokens, count_tokens))
+        for chunk_units in _pack(units, max_tokens, overlap):
+            text = " ".join(unit[0] for unit in chunk_units)
+            if dedup is not None and dedup.is_duplicate(text):
+                continue
+            yield text, source, chunk_units[0][1], chunk_units[-1][2]
+
+    source, doc_pages = None, []
+    for page_source, page_no, text in pages:
+        if page_source != source:
+            if doc_pages:
+                yield from document_chunks(source, doc_pages)
+            source, doc_pages = page_source, []
+        doc_pages.append((page_no, text))
+    if doc_pages:
+        yield from document_chunks(source, doc_pages)
@@ -0,0 +1,152 @@
+import os
+import io
+import hashlib
+import itertools
+import sqlite3
+import numpy as np
+
+EMBEDDING_CACHE_PATH = os.path.join("embedding_cache", "embeddings.sqlite")
+
+def embedding_key(model_name, text):
+    """Cache key of one chunk: SHA-256 over model name and chunk text"""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """SQLite store of float32 embeddings keyed by embedding_key"""
+
+    def __init__(self, path=EMBEDDING_CACHE_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+        self.db.commit()
+
+    def get_many(self, keys, dim):
+        """{key: vector} for the keys that are cached"""
+        found = {}
+        keys = list(keys)
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            rows = self.db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part)
+            for key, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                if len(vector) == dim:
+                    found[key] = vector
+        return found
+
+    def put_many(self, items):
+        self.db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+                            ((key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items))
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+class NpyRowWriter:
+    """float32 rows appended to a .npy file whose row count is not known up front
+
+    Room for the header is left at the start and it is written on close,
+    once the shape is known.
+    """
+
+    def __init__(self, path, dim):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.dim = dim
+        self.rows = 0
+        self.header_size = len(self._header(0))
+        self.file = open(path, "wb")
+        self.file.seek(self.header_size)
+
+    def _header(self, rows):
+        buffer = io.BytesIO()
+        np.lib.format.write_array_header_1_0(
+            buffer, {"descr": "<f4", "fortran_order": False, "shape": (rows, self.dim)})
+        return buffer.getvalue()
+
+    def append(self, rows):
+        self.file.write(np.ascontiguousarray(rows, dtype="<f4").tobytes())
+        self.rows += len(rows)
+
+    def close(self):
+        """Write the header and return the rows memory-mapped read-only"""
+        header = self._header(self.rows)
+        if len(header) != self.header_size:
+            raise ValueError(f"{self.path}: .npy header for {self.rows} rows does not fit the space left for it")
+        self.file.seek(0)
+        self.file.write(header)
+        self.file.close()
+        if not self.rows:
+            return np.empty((0, self.dim), dtype=np.float32)
+        return np.load(self.path, mmap_mode="r")
+
+def embed_texts(texts, embedder, model_name, batch_size=64, workers=1, cache=None, out_path=None):
+    """Normalized float32 embeddings of texts, one row per text
+
+    texts may be any iterable, a generator included: it is consumed
+    batch_size (times workers) texts at a time and never held whole. Each
+    slice is looked up in `cache`, its missing texts embedded (duplicates
+    within a slice once, with workers > 1 over a pool of CPU processes)
+    and cached, and its rows appended to the result: one matrix in
+    memory, or a .npy file memory-mapped from out_path when given.
+    Returns (matrix, number of texts actually embedded).
+    """
+    dim = embedder.get_sentence_embedding_dimension()
+    writer = NpyRowWriter(out_path, dim) if out_path else None
+    parts = []
+    total = embedded = 0
+
+    step = batch_size * max(workers, 1)
+    pool = embedder.start_multi_process_pool(["cpu"] * workers) if workers > 1 else None
+    texts = iter(texts)
+    try:
+        # One slice at a time, cached as soon as it is done, so peak memory
+        # stays one slice and an interrupted run keeps what it finished
+        while True:
+            part = list(itertools.islice(texts, step))
+            if not part:
+                break
+            keys = [embedding_key(model_name, text) for text in part]
+            cached = cache.get_many(set(keys), dim) if cache is not None else {}
+
+            rows = np.empty((len(part), dim), dtype=np.float32)
+            rows_by_key = {}
+            for row, key in enumerate(keys):
+                if key in cached:
+                    rows[row] = cached[key]
+                else:
+                    rows_by_key.setdefault(key, []).append(row)
+
+            missing_keys = list(rows_by_key)
+            if missing_keys:
+                missing_texts = [part[rows_by_key[key][0]] for key in missing_keys]
+                if pool is not None:
+                    vectors = embedder.encode_multi_process(missing_texts, pool, batch_size=batch_size,
+                                                            normalize_embeddings=True)
+                else:
+                    vectors = embedder.encode(missing_texts, batch_size=batch_size, normalize_embeddings=True,
+                                              show_progress_bar=False, convert_to_numpy=True)
+                vectors = np.asarray(vectors, dtype=np.float32)
+                for key, vector in zip(missing_keys, vectors):
+                    rows[rows_by_key[key]] = vector
+                if cache is not None:
+                    cache.put_many(zip(missing_keys, vectors))
+
+            if writer is not None:
+                writer.append(rows)
+            else:
+                parts.append(rows)
+            total += len(part)
+            embedded += len(missing_keys)
+            print(f"  Embedded {embedded} chunks, {total - embedded} from cache", end="\r", flush=True)
+        if total:
+            print()
+    finally:
+        if pool is not None:
+            embedder.stop_multi_process_pool(pool)
+        if writer is not None:
+            matrix = writer.close()
+
+    if writer is None:
+        matrix = np.concatenate(parts) if parts else np.empty((0, dim), dtype=np.float32)
+    return matrix, embedded
@@ -0,0 +1,54 @@
+import os
+
+# Backend for the embedder and the answer model, all on CPU:
+#   torch - default fp32 PyTorch
+#   int8  - PyTorch with dynamic int8 quantization of the Linear layers
+#   onnx  - ONNX Runtime session exported through optimum
+BACKENDS = ("torch", "int8", "onnx")
+INFERENCE_BACKEND = os.environ.get("VASHISTH_INFERENCE_BACKEND", "torch")
+
+def resolve_backend(backend=None):
+    backend = backend or INFERENCE_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+    return backend
+
+def quantize_int8(model):
+    """Copy of a torch module with Linear weights quantized to int8"""
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def load_embedder(model_name, backend=None):
+    """SentenceTransformer on the selected backend"""
+    from sentence_transformers import SentenceTransformer
+    backend = resolve_backend(backend)
+    if backend == "onnx":
+        try:
+            return SentenceTransformer(model_name, device="cpu", backend="onnx")
+        except ImportError as e:
+            raise ImportError("The onnx backend needs `pip install optimum[onnxruntime]`") from e
+    embedder = SentenceTransformer(model_name, device="cpu")
+    if backend == "int8":
+        embedder = quantize_int8(embedder)
+    return embedder
+
+def load_text2text_pipeline(model_name, backend=None):
+    """Hugging Face text2text-generation pipeline on the selected backend"""
+    from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
+    backend = resolve_backend(backend)
+    if backend == "torch":
+        return pipeline("text2text-generation", model=model_name, device="cpu")
+    if backend == "int8":
+        model = quantize_int8(AutoModelForSeq2SeqLM.from_pretrained(model_name))
+    else:
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise ImportError("The onnx backend needs `pip install optimum[onnxruntime]`") from e
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+    return pipeline("text2text-generation", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+
+def embedding_model_id(model_name, backend=None):
+    """Model identity for embedding cache keys; vectors differ between backends"""
+    backend = resolve_backend(backend)
+    return model_name if backend == "torch" else f"{model_name}:{backend}"
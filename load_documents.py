@@ -1,17 +1,152 @@
 import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pypdf import PdfReader
 
-def load_all_pdfs_from_folder(folder_path):
-    all_text = ""
-    for filename in os.listdir(folder_path):
+PAGE_CACHE_DIR = "page_cache"
+MANIFEST_NAME = "manifest.json"
+
+def iter_pdf_pages(folder_path):
+    """Lazily yield (source, page_no, text) for every page with text"""
+    for filename in sorted(os.listdir(folder_path)):
         if filename.endswith(".pdf"):
-            file_path = os.path.join(folder_path, filename)
-            reader = PdfReader(file_path)
-            for page in reader.pages:
+            reader = PdfReader(os.path.join(folder_path, filename))
+            for page_no, page in enumerate(reader.pages, 1):
                 page_text = page.extract_text()
                 if page_text:
-                    all_text += page_text + "\n"
-    return all_text
+                    yield filename, page_no, page_text
+
+def iter_cached_pages(ingested):
+    """Yield (source, page_no, text) from ingest_folder results, one file in memory at a time"""
+    for doc in ingested:
+        for page_no, text in load_cached_pages(doc["cache_path"]):
+            yield doc["source"], page_no, text
+
+def load_all_pdfs_from_folder(folder_path):
+    return "".join(text + "\n" for _, _, text in iter_pdf_pages(folder_path))
+
+def file_content_hash(file_path):
+    """SHA-256 of a file's bytes, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def extract_pages(file_path, start=0, stop=None):
+    """[(page_no, text), ...] for pages with text in [start, stop), 1-based page numbers"""
+    reader = PdfReader(file_path)
+    pages = []
+    for index in range(start, min(stop or len(reader.pages), len(reader.pages))):
+        page_text = reader.pages[index].extract_text()
+        if page_text:
+            pages.append((index + 1, page_text))
+    return pages
+
+def count_pages(file_path):
+    return len(PdfReader(file_path).pages)
+
+def _write_page_cache(cache_path, source, pages):
+    """Write one PDF's page cache file atomically"""
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"source": source, "pages": pages}, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+def ingest_folder(folder_path, cache_dir=PAGE_CACHE_DIR, workers=None, pages_per_task=16):
+    """Extract pages of every PDF in folder_path, reusing cached extractions
+
+    Each PDF's pages are cached under its content hash, so only new or
+    changed files are extracted. Extraction is split into page ranges
+    spread over a process pool, and a file's cache is written as soon as
+    all its ranges are done. A manifest of (size, mtime) -> hash avoids
+    re-hashing untouched files.
+    Returns one dict per PDF: source, hash, cache_path, page_count, cached.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    files = []
+    new_manifest = {}
+    for filename in sorted(os.listdir(folder_path)):
+        if not filename.lower().endswith(".pdf"):
+            continue
+        file_path = os.path.join(folder_path, filename)
+        stat = os.stat(file_path)
+        entry = manifest.get(filename)
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            content_hash = entry["hash"]
+        else:
+            content_hash = file_content_hash(file_path)
+        known_pages = entry.get("page_count") if entry and entry["hash"] == content_hash else None
+        new_manifest[filename] = {"size": stat.st_size, "mtime": stat.st_mtime, "hash": content_hash}
+        files.append({
+            "source": filename,
+            "hash": content_hash,
+            "cache_path": os.path.join(cache_dir, f"{content_hash}.json"),
+            "page_count": known_pages,
+            "cached": True,
+            "file_path": file_path
+        })
+
+    pending = [doc for doc in files if not os.path.exists(doc["cache_path"])]
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            failed = set()
+            results = {}
+            futures = {}
+            for doc, future in [(doc, pool.submit(count_pages, doc["file_path"])) for doc in pending]:
+                try:
+                    total = future.result()
+                except Exception as e:
+                    print(f"⚠️ Error loading {doc['source']}: {str(e)}")
+                    failed.add(doc["source"])
+                    continue
+                results[doc["source"]] = [None] * max(1, -(-total // pages_per_task))
+                for task, start in enumerate(range(0, max(total, 1), pages_per_task)):
+                    future = pool.submit(extract_pages, doc["file_path"], start, start + pages_per_task)
+                    futures[future] = (doc, task)
+
+            for future in as_completed(futures):
+                doc, task = futures[future]
+                if doc["source"] in failed:
+                    continue
+                try:
+                    results[doc["source"]][task] = future.result()
+                except Exception as e:
+                    print(f"⚠️ Error loading {doc['source']}: {str(e)}")
+                    failed.add(doc["source"])
+                    continue
+                parts = results[doc["source"]]
+                if all(part is not None for part in parts):
+                    pages = [page for part in parts for page in part]
+                    _write_page_cache(doc["cache_path"], doc["source"], pages)
+                    doc["page_count"] = len(pages)
+                    doc["cached"] = False
+
+        for doc in [doc for doc in files if doc["source"] in failed]:
+            del new_manifest[doc["source"]]
+            files.remove(doc)
+
+    for doc in files:
+        if doc["page_count"] is None:
+            doc["page_count"] = len(load_cached_pages(doc["cache_path"]))
+        new_manifest[doc["source"]]["page_count"] = doc["page_count"]
+        del doc["file_path"]
+
+    with open(manifest_path, "w") as f:
+        json.dump(new_manifest, f, indent=2)
+    return files
+
+def load_cached_pages(cache_path):
+    """[(page_no, text), ...] from a page cache file written by ingest_folder"""
+    with open(cache_path, encoding="utf-8") as f:
+        return [tuple(page) for page in json.load(f)["pages"]]
 
 if __name__ == "__main__":
     folder = "source_pdfs"
@@ -0,0 +1,115 @@
+import os
+import re
+import json
+from collections import Counter, defaultdict
+from utils.astro_constants import PLANET_ORDER
+
+PLACEMENT_INDEX_FILE = "placement_index.json"
+
+# Names the texts use for each planet, sign (numbered as in chart 'sign') and house
+PLANET_ALIASES = {
+    'Sun': ['Sun', 'Surya', 'Ravi'],
+    'Moon': ['Moon', 'Chandra'],
+    'Mars': ['Mars', 'Kuja', 'Mangala'],
+    'Mercury': ['Mercury', 'Budha'],
+    'Jupiter': ['Jupiter', 'Guru', 'Brihaspati'],
+    'Venus': ['Venus', 'Sukra', 'Shukra'],
+    'Saturn': ['Saturn', 'Sani', 'Shani'],
+    'Rahu': ['Rahu'],
+    'Ketu': ['Ketu'],
+}
+SIGN_ALIASES = {
+    1: ['Aries', 'Mesha'], 2: ['Taurus', 'Vrishabha', 'Rishabha'], 3: ['Gemini', 'Mithuna'],
+    4: ['Cancer', 'Kataka', 'Karkataka', 'Karka'], 5: ['Leo', 'Simha'], 6: ['Virgo', 'Kanya'],
+    7: ['Libra', 'Thula', 'Tula'], 8: ['Scorpio', 'Vrischika', 'Vrishchika'],
+    9: ['Sagittarius', 'Dhanus', 'Dhanu'], 10: ['Capricorn', 'Makara'], 11: ['Aquarius', 'Kumbha'],
+    12: ['Pisces', 'Meena'],
+}
+ORDINAL_WORDS = ['first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth',
+                 'ninth', 'tenth', 'eleventh', 'twelfth']
+STRENGTH_WORDS = {'E': r'exalt\w*|uchcha\w*', 'D': r'debilitat\w*|neecha\w*'}
+
+def _alternation(names):
+    return r'\b(' + '|'.join(sorted(names, key=len, reverse=True)) + r')\b'
+
+_PLANET_RE = re.compile(_alternation([a for aliases in PLANET_ALIASES.values() for a in aliases]))
+_PLANET_BY_ALIAS = {a: planet for planet, aliases in PLANET_ALIASES.items() for a in aliases}
+_SIGN_RE = re.compile(_alternation([a for aliases in SIGN_ALIASES.values() for a in aliases]))
+_SIGN_BY_ALIAS = {a: sign for sign, aliases in SIGN_ALIASES.items() for a in aliases}
+# "10th house", "tenth bhava", "in the 10th" -- but not "the 10th lord"
+_HOUSE_RE = re.compile(r'\b(?:(1[0-2]|[1-9])\s?(?:st|nd|rd|th)|(' + '|'.join(ORDINAL_WORDS) + r'))\b'
+                       r'(?!\s+(?:lord|from))', re.IGNORECASE)
+_STRENGTH_RES = {value: re.compile(r'\b(?:' + pattern + r')', re.IGNORECASE)
+                 for value, pattern in STRENGTH_WORDS.items()}
+_SENTENCE_RE = re.compile(r'(?<=[.!?;])\s+')
+
+def key_string(planet, facet, value):
+    """'Jupiter|house|10' -- JSON-safe form of a placement key"""
+    return f"{planet}|{facet}|{value}"
+
+def placement_keys(text):
+    """Placement keys mentioned in a text
+
+    A key is recorded when a planet and a sign, house or exaltation/
+    debilitation word occur in the same sentence.
+    """
+    keys = set()
+    for sentence in _SENTENCE_RE.split(text):
+        planets = {_PLANET_BY_ALIAS[m] for m in _PLANET_RE.findall(sentence)}
+        if not planets:
+            continue
+        facets = [('sign', _SIGN_BY_ALIAS[m]) for m in _SIGN_RE.findall(sentence)]
+        for number, word in _HOUSE_RE.findall(sentence):
+            facets.append(('house', int(number) if number else ORDINAL_WORDS.index(word.lower()) + 1))
+        facets += [('strength', value) for value, pattern in _STRENGTH_RES.items() if pattern.search(sentence)]
+        keys.update(key_string(planet, facet, value) for planet in planets for facet, value in facets)
+    return keys
+
+def add_placements(index, chunk_id, text):
+    """Add one chunk's keys to an index being built chunk by chunk (a defaultdict(list))"""
+    for key in placement_keys(text):
+        index[key].append(chunk_id)
+
+def build_placement_index(chunks):
+    """{key string: sorted chunk ids} over chunk texts, ids being list positions"""
+    index = defaultdict(list)
+    for chunk_id, text in enumerate(chunks):
+        add_placements(index, chunk_id, text)
+    return dict(sorted(index.items()))
+
+def save_placement_index(index, directory):
+    with open(os.path.join(directory, PLACEMENT_INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(index.items())), f)
+
+def load_placement_index(directory):
+    with open(os.path.join(directory, PLACEMENT_INDEX_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+def chart_placement_keys(chart):
+    """Placement keys of each planet in a calculate_vedic_chart result"""
+    keys = {}
+    for planet in PLANET_ORDER:
+        data = chart['planets'][planet]
+        keys[planet] = [key_string(planet, 'sign', data['sign']), key_string(planet, 'house', data['house'])]
+        if data['strength']:
+            keys[planet].append(key_string(planet, 'strength', data['strength']))
+    return keys
+
+def chart_passages(chart, index, limit=20):
+    """Chunk ids relevant to a chart's placements, best first
+
+    Chunks matching more facets of one planet's placement (e.g. both its
+    house and its sign) rank first. Returns [(chunk_id, matched keys)].
+    """
+    matched = defaultdict(list)
+    score = Counter()
+    for planet, keys in chart_placement_keys(chart).items():
+        per_planet = Counter()
+        for key in keys:
+            for chunk_id in index.get(key, ()):
+                matched[chunk_id].append(key)
+                per_planet[chunk_id] += 1
+        for chunk_id, n in per_planet.items():
+            score[chunk_id] += n * n
+    ranked = sorted(score, key=lambda chunk_id: (-score[chunk_id], chunk_id))
+    return [(chunk_id, matched[chunk_id]) for chunk_id in ranked[:limit]]
@@ -1,16 +1,173 @@
-from transformers import pipeline
+import threading
+from collections import OrderedDict
+import batching
+import inference_backend
 
-# Initialize the Hugging Face pipeline
-qa_pipeline = pipeline(
-    "text2text-generation",
-    model="google/flan-t5-small"  # Free, lightweight model
-)
+MODEL_NAME = "google/flan-t5-small"  # Free, lightweight model
+MAX_LENGTH = 256
+MAX_INPUT_TOKENS = 512  # flan-t5 input length, for tokenizers that report no limit
+TOP_K = 4
+GENERATE_BATCH_SIZE = 8
+
+_qa_pipeline = None
+_pipeline_lock = threading.Lock()
+
+def get_qa_pipeline():
+    """Hugging Face pipeline, created on first use rather than at import"""
+    global _qa_pipeline
+    with _pipeline_lock:
+        if _qa_pipeline is None:
+            # Backend from VASHISTH_INFERENCE_BACKEND: torch, int8 or onnx
+            _qa_pipeline = inference_backend.load_text2text_pipeline(MODEL_NAME)
+        return _qa_pipeline
+
+def generate_answers(prompts, batch_size=GENERATE_BATCH_SIZE):
+    """Answers to several prompts from batched generate calls"""
+    responses = get_qa_pipeline()(list(prompts), max_length=MAX_LENGTH, truncation=True, batch_size=batch_size)
+    return [response['generated_text'] for response in responses]
 
 def generate_answer(prompt):
-    response = qa_pipeline(prompt, max_length=256, truncation=True)
-    return response[0]['generated_text']
+    return generate_answers([prompt])[0]
+
+def normalize_question(question):
+    """Lowercase, single-spaced question without trailing punctuation, for cache keys"""
+    return " ".join(question.lower().split()).rstrip(" ?!.")
+
+def prompt_limits():
+    """(max input tokens, token counter) of the generator's tokenizer"""
+    tokenizer = get_qa_pipeline().tokenizer
+    max_tokens = tokenizer.model_max_length
+    if not max_tokens or max_tokens > 100000:  # "no limit" sentinel
+        max_tokens = MAX_INPUT_TOKENS
+    return max_tokens, lambda text: len(tokenizer.encode(text))
+
+def _fit(text, budget, count_tokens):
+    """Longest word prefix of text within budget tokens ('' if none)"""
+    words = text.split()
+    keep = len(words)
+    while keep and count_tokens(" ".join(words[:keep])) > budget:
+        keep = min(keep - 1, keep * budget // max(count_tokens(" ".join(words[:keep])), 1))
+    return " ".join(words[:keep])
+
+def build_prompt(question, hits, max_tokens=None, count_tokens=None):
+    """Prompt with the question first and the retrieved chunks as numbered context
+
+    With max_tokens and count_tokens the context is cut to fit, so the
+    generator's right-side truncation never drops part of the prompt.
+    """
+    if not hits:
+        return question
+    head = ("Answer the question using the context from Vedic astrology texts.\n\n"
+            f"Question: {question}\n\nContext:\n")
+    tail = "\n\nAnswer:"
+    entries = [f"[{i}] ({hit['source']}, pages {hit['page_range']}) {hit['text']}"
+               for i, hit in enumerate(hits, 1)]
+    if max_tokens is not None:
+        budget = max_tokens - count_tokens(head + tail)
+        fitted = []
+        for entry in entries:
+            cost = count_tokens(entry + "\n")
+            if cost > budget:
+                entry = _fit(entry, budget - 1, count_tokens)
+                if entry:
+                    fitted.append(entry)
+                break
+            fitted.append(entry)
+            budget -= cost
+        entries = fitted
+    return head + "\n".join(entries) + tail
+
+class AnswerCache:
+    """Thread-safe LRU of answers keyed by normalized question and retrieved chunk ids"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(question, hits):
+        return normalize_question(question), tuple(hit["id"] for hit in hits)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, answer):
+        with self._lock:
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+class QAService:
+    """Retrieval-augmented answering with batched generation and an answer cache
+
+    ask() may be called from many threads; questions arriving within
+    max_wait_ms of each other are retrieved and generated as one batch.
+    """
+
+    def __init__(self, retriever=None, k=TOP_K, max_batch=GENERATE_BATCH_SIZE, max_wait_ms=20, cache_size=1024):
+        self._retriever = retriever
+        self.k = k
+        self.max_batch = max_batch
+        self.cache = AnswerCache(cache_size)
+        self._batcher = batching.MicroBatcher(self.answer_many, max_batch, max_wait_ms)
+
+    @property
+    def retriever(self):
+        if self._retriever is None:
+            import retrieval_service
+            self._retriever = retrieval_service.get_retriever()
+        return self._retriever
+
+    def answer_many(self, questions):
+        """One result dict per question: answer, sources and whether it was cached"""
+        if not questions:
+            return []
+        hits_per_question = self.retriever.search(questions, self.k)
+        results = [None] * len(questions)
+        max_tokens, count_tokens = prompt_limits()
+        pending = {}  # cache key -> (prompt, [result positions])
+        for i, (question, hits) in enumerate(zip(questions, hits_per_question)):
+            key = AnswerCache.key(question, hits)
+            sources = [{"source": hit["source"], "page_range": hit["page_range"]} for hit in hits]
+            results[i] = {"question": question, "answer": self.cache.get(key), "sources": sources, "cached": True}
+            if results[i]["answer"] is None:
+                results[i]["cached"] = False
+                pending.setdefault(key, (build_prompt(question, hits, max_tokens, count_tokens), []))[1].append(i)
+
+        if pending:
+            answers = generate_answers([prompt for prompt, _ in pending.values()], self.max_batch)
+            for (key, (_, positions)), answer in zip(pending.items(), answers):
+                self.cache.put(key, answer)
+                for i in positions:
+                    results[i]["answer"] = answer
+        return results
+
+    def ask(self, question, timeout=None):
+        """Answer one question, batched with other concurrent callers"""
+        return self._batcher.submit(question).result(timeout)
+
+_service = None
+
+def get_qa_service():
+    """Process-wide QAService sharing the warm retriever"""
+    global _service
+    with _pipeline_lock:
+        if _service is None:
+            _service = QAService()
+        return _service
 
 if __name__ == "__main__":
-    sample_prompt = "What is Vedic Astrology?"
-    answer = generate_answer(sample_prompt)
-    print(f"Sample Answer: {answer}")
+    sample_question = "What is Vedic Astrology?"
+    result = get_qa_service().ask(sample_question)
+    print(f"Sample Answer: {result['answer']}")
+    for source in result["sources"]:
+        print(f"  - {source['source']} (pages {source['page_range']})")
@@ -0,0 +1,222 @@
+import os
+import json
+import pickle
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import faiss
+import batching
+import vector_index
+import chunk_store
+import inference_backend
+import placement_index
+
+STORE_DIR = "faiss_store"
+HOST, PORT = "127.0.0.1", 8765
+MAX_K = 100
+
+def store_version(store_dir=STORE_DIR):
+    """Identity of the vector store build currently at store_dir, None while it is being swapped"""
+    try:
+        stat = os.stat(os.path.join(store_dir, "metadata.pkl"))
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+class Retriever:
+    """FAISS index, chunk metadata and embedder loaded once and kept warm"""
+
+    def __init__(self, store_dir=STORE_DIR, embedder=None, mmap=True, backend=None):
+        self.store_dir = store_dir
+        self.version = store_version(store_dir)
+        with open(os.path.join(store_dir, "metadata.pkl"), "rb") as f:
+            self.metadata = pickle.load(f)
+        if "chunk_store" in self.metadata:
+            self.store = chunk_store.ChunkStore(os.path.join(store_dir, self.metadata["chunk_store"]))
+        else:
+            # Vector stores built before the chunk store pickled every chunk
+            self.store = None
+            self.chunks = self.metadata["chunks"]
+            self.chunk_metadata = self.metadata["metadata"]
+
+        # Vector stores built before the placement index have no chart lookup
+        placement_path = os.path.join(store_dir, placement_index.PLACEMENT_INDEX_FILE)
+        self.placements = placement_index.load_placement_index(store_dir) if os.path.exists(placement_path) else {}
+
+        index_path = os.path.join(store_dir, "index.faiss")
+        self.index = None
+        if mmap:
+            # Shares pages with other processes; not every index type supports it
+            try:
+                self.index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                self.index = None
+        if self.index is None:
+            self.index = faiss.read_index(index_path)
+        vector_index.apply_search_params(self.index, self.metadata.get("index", {}))
+
+        if embedder is None:
+            # Queries default to the backend the corpus was embedded with
+            backend = backend or self.metadata.get("embedding_backend", "torch")
+            embedder = inference_backend.load_embedder(self.metadata["embedding_model"], backend)
+        self.embedder = embedder
+        self.embedder.encode(["warm up"], normalize_embeddings=True)
+
+    def is_stale(self):
+        """True once build_vector_store has swapped a new store in at store_dir"""
+        version = store_version(self.store_dir)
+        return version is not None and version != self.version
+
+    def chunk(self, chunk_id):
+        """(text, metadata dict) of a FAISS id"""
+        if self.store is not None:
+            return self.store.chunk_text(chunk_id), self.store.chunk_metadata(chunk_id)
+        return self.chunks[chunk_id], self.chunk_metadata[chunk_id]
+
+    def hit(self, chunk_id, score):
+        text, metadata = self.chunk(chunk_id)
+        return {"id": int(chunk_id), "score": float(score), "text": text, **metadata}
+
+    def search(self, queries, k=5):
+        """Top-k chunks for each query string, as lists of hit dicts"""
+        if not queries:
+            return []
+        vectors = self.embedder.encode(list(queries), normalize_embeddings=True, batch_size=64)
+        scores, ids = self.index.search(np.asarray(vectors, dtype=np.float32), k)
+        return [[self.hit(i, s) for i, s in zip(row_ids, row_scores) if i >= 0]
+                for row_ids, row_scores in zip(ids, scores)]
+
+    def chart_context(self, chart, limit=20):
+        """Chunks about a chart's placements from the placement index, no embedding search"""
+        hits = []
+        for chunk_id, keys in placement_index.chart_passages(chart, self.placements, limit):
+            text, metadata = self.chunk(chunk_id)
+            hits.append({"id": chunk_id, "placements": keys, "text": text, **metadata})
+        return hits
+
+class MicroBatcher(batching.MicroBatcher):
+    """Groups concurrent single queries into one Retriever.search call
+
+    A batch is flushed when it reaches max_batch queries or when the first
+    query in it has waited max_wait_ms.
+    """
+
+    def __init__(self, retriever, max_batch=32, max_wait_ms=5):
+        super().__init__(self._search_batch, max_batch, max_wait_ms)
+        self.retriever = retriever
+
+    def submit(self, query, k=5):
+        return super().submit((query, k))
+
+    def search(self, query, k=5, timeout=None):
+        return self.submit(query, k).result(timeout)
+
+    def _search_batch(self, items):
+        k = max(item_k for _, item_k in items)
+        results = self.retriever.search([query for query, _ in items], k)
+        return [hits[:item_k] for (_, item_k), hits in zip(items, results)]
+
+_retriever = None
+_batcher = None
+_lock = threading.Lock()
+
+def get_retriever(store_dir=STORE_DIR):
+    """Process-wide Retriever, loaded on first use and reopened after a rebuild
+
+    A rebuilt store is a new directory, so the old Retriever keeps serving
+    from its mapped files until the new one is loaded.
+    """
+    global _retriever
+    with _lock:
+        if _retriever is None:
+            _retriever = Retriever(store_dir)
+        elif _retriever.is_stale():
+            _retriever = Retriever(store_dir, embedder=_retriever.embedder)
+        return _retriever
+
+def get_batcher():
+    global _batcher
+    retriever = get_retriever()
+    with _lock:
+        if _batcher is None:
+            _batcher = MicroBatcher(retriever)
+        _batcher.retriever = retriever
+        return _batcher
+
+def parse_k(value):
+    """k from a request as an int in 1..MAX_K; ValueError otherwise"""
+    try:
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError
+        k = int(value)
+    except ValueError:
+        raise ValueError(f"k must be an integer, got {value!r}") from None
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}, got {k}")
+    return k
+
+class SearchHandler(BaseHTTPRequestHandler):
+    """GET /search?q=...&k=5 or POST /search {"queries": [...], "k": 5}"""
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/search":
+            return self._reply(404, {"error": "not found"})
+        params = parse_qs(url.query)
+        if "q" not in params:
+            return self._reply(400, {"error": "missing q"})
+        try:
+            k = parse_k(params.get("k", ["5"])[0])
+        except ValueError as e:
+            return self._reply(400, {"error": str(e)})
+        self._search([params["q"][0]], k, single=True)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/search":
+            return self._reply(404, {"error": "not found"})
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            queries = request["queries"]
+            k = parse_k(request.get("k", 5))
+        except ValueError as e:
+            return self._reply(400, {"error": str(e)})
+        except (KeyError, TypeError):
+            return self._reply(400, {"error": "expected {\"queries\": [...], \"k\": 5}"})
+        # A bare string would otherwise be searched one character at a time
+        if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+            return self._reply(400, {"error": "queries must be a list of strings"})
+        self._search(queries, k)
+
+    def _search(self, queries, k, single=False):
+        batcher = get_batcher()
+        futures = [batcher.submit(q, k) for q in queries]
+        try:
+            results = [f.result() for f in futures]
+        except Exception as e:
+            return self._reply(500, {"error": f"search failed: {e}"})
+        self._reply(200, {"results": results[0] if single else results})
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(host=HOST, port=PORT):
+    print("Loading retriever...")
+    start = time.time()
+    get_batcher()
+    print(f"✓ Index and embedder ready in {time.time() - start:.2f} seconds")
+    server = ThreadingHTTPServer((host, port), SearchHandler)
+    print(f"Serving retrieval on http://{host}:{port}/search")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    serve()
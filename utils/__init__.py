@@ -1,35 +1,88 @@
 """Vedic Astrology utilities package initialization."""
+from .log_config import set_debug_tracing
 from .dasha_calculator import (
     calculate_vimshottari_dasha,
     get_dasha_display_text,
     display_dashas
 )
+from .dasha_timeline import DashaTimeline, DashaPeriod, DASHA_LEVELS, vimshottari_lords, mahadasha_offsets
 from .calculations import (
     calculate_planetary_strength,
-    calculate_vedic_chart
+    calculate_vedic_chart,
+    calculate_vedic_chart_batch,
+    calculate_chart_arrays
 )
-from .chart_plotter import plot_vedic_chart, HAS_DROPDOWN
-from .geo_utils import get_geo_details
+from .chart_plotter import plot_vedic_chart, render_vedic_chart, HAS_DROPDOWN
+from .chart_cache import configure_chart_cache, get_chart_cache, chart_key
+from .compact_chart import CompactChart, CHART_DTYPE, charts_to_records, records_from_batch
+from .ephemeris import compute_positions, EphemerisRecord
+from .ephemeris_table import EphemerisTable, build_ephemeris_table
+from .transit_events import TransitEvent, PlanetScan, ingresses, stations, aspect_crossings, transit_events
+from .lagna_index import LagnaIndex
+from .rectification import sweep_arrays, iter_rectification, rectify
+from .varga import SHODASHAVARGA, VARGA_NAMES, varga_signs, varga_table, chart_vargas, add_vargas, records_with_vargas
+from .geo_utils import get_geo_details, configure_geo_cache, get_geo_cache
 from .astro_constants import (
     PLANET_STRENGTHS,
     DASHA_PERIODS,
     DASHA_ORDER,
+    PLANET_ORDER,
     SIGN_NAMES,
     PLANET_COLORS
 )
 
 __all__ = [
+    'set_debug_tracing',
     'calculate_vimshottari_dasha',
     'get_dasha_display_text',
     'display_dashas',
+    'DashaTimeline',
+    'DashaPeriod',
+    'DASHA_LEVELS',
+    'vimshottari_lords',
+    'mahadasha_offsets',
     'calculate_planetary_strength',
     'calculate_vedic_chart',
+    'calculate_vedic_chart_batch',
+    'calculate_chart_arrays',
     'plot_vedic_chart',
+    'render_vedic_chart',
     'HAS_DROPDOWN',
+    'configure_chart_cache',
+    'get_chart_cache',
+    'chart_key',
+    'CompactChart',
+    'CHART_DTYPE',
+    'charts_to_records',
+    'records_from_batch',
+    'compute_positions',
+    'EphemerisRecord',
+    'EphemerisTable',
+    'build_ephemeris_table',
+    'TransitEvent',
+    'PlanetScan',
+    'ingresses',
+    'stations',
+    'aspect_crossings',
+    'transit_events',
+    'LagnaIndex',
+    'sweep_arrays',
+    'iter_rectification',
+    'rectify',
+    'SHODASHAVARGA',
+    'VARGA_NAMES',
+    'varga_signs',
+    'varga_table',
+    'chart_vargas',
+    'add_vargas',
+    'records_with_vargas',
     'get_geo_details',
+    'configure_geo_cache',
+    'get_geo_cache',
     'PLANET_STRENGTHS',
     'DASHA_PERIODS',
     'DASHA_ORDER',
+    'PLANET_ORDER',
     'SIGN_NAMES',
     'PLANET_COLORS'
 ]
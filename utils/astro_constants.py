@@ -24,6 +24,9 @@ DASHA_PERIODS = {
     'Mercury': 17
 }
 
+# Order of planets in chart output (also the column order of batch results)
+PLANET_ORDER = ['Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Rahu', 'Ketu']
+
 # Correct order of planets in Vimshottari Dasha
 DASHA_ORDER = ['Ketu', 'Venus', 'Sun', 'Moon', 'Mars', 'Rahu', 'Jupiter', 'Saturn', 'Mercury']
 
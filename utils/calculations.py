@@ -1,9 +1,16 @@
+import logging
 import swisseph as swe
+import numpy as np
 import pytz
 from datetime import datetime
-from .astro_constants import PLANET_STRENGTHS, SIGN_NAMES
+from .astro_constants import PLANET_STRENGTHS, PLANET_ORDER, SIGN_NAMES
 from .geo_utils import get_geo_details
 from .dasha_calculator import calculate_vimshottari_dasha
+from .dasha_timeline import DashaTimeline
+from .ephemeris import compute_positions
+from .chart_cache import chart_key, get_chart_cache
+
+logger = logging.getLogger(__name__)
 
 def calculate_planetary_strength(planet_name, planet_sign):
     """Determine if planet is exalted or debilitated"""
@@ -17,14 +24,22 @@ def calculate_planetary_strength(planet_name, planet_sign):
         return 'D'
     return ''
 
-def calculate_vedic_chart(dob, tob, pob):
-    """Calculate standard North Indian chart with all corrections"""
+def calculate_vedic_chart(dob, tob, pob, use_cache=True, geo=None):
+    """Calculate standard North Indian chart with all corrections
+
+    Pass geo (a get_geo_details result for pob) when the place is already
+    resolved, to skip geocoding. Results are cached by birth instant,
+    place, ayanamsa and house system (see utils.chart_cache); the 'dashas'
+    list is rebuilt for today on every call, the rest of a cached chart is
+    shared, so do not mutate it.
+    """
     try:
         # Get geographic details
-        geo = get_geo_details(pob)
-        print(f"\n📍 Location: {geo['address']}")
-        print(f"   Coordinates: {geo['lat']}°N, {geo['lon']}°E")
-        print(f"   Timezone: {geo['tz']}")
+        if geo is None:
+            geo = get_geo_details(pob)
+        logger.info("📍 Location: %s", geo['address'])
+        logger.info("   Coordinates: %s°N, %s°E", geo['lat'], geo['lon'])
+        logger.info("   Timezone: %s", geo['tz'])
 
         # Convert to datetime with timezone
         local_tz = pytz.timezone(geo['tz'])
@@ -35,68 +50,50 @@ def calculate_vedic_chart(dob, tob, pob):
         jd = swe.julday(utc_dt.year, utc_dt.month, utc_dt.day,
                         utc_dt.hour + utc_dt.minute/60 + utc_dt.second/3600)
 
+        if use_cache:
+            cache_key = chart_key(utc_dt, geo['lat'], geo['lon'], swe.get_ayanamsa(jd), b'W')
+            cached = get_chart_cache().get(cache_key)
+            if cached is not None:
+                return dict(cached, dashas=calculate_vimshottari_dasha(
+                    birth_dt, cached['planets']['Moon']['position'] % 360))
+
         # 1. Calculate Lagna and houses
         houses = swe.houses(jd, geo['lat'], geo['lon'], b'W')[0]  # Whole sign houses
         lagna_pos = houses[0]
         lagna_sign = int(lagna_pos // 30) + 1
         lagna_degree = round(lagna_pos % 30, 2)
 
-        # 2. Calculate planetary positions
-        planets = {
-            'Sun': swe.SUN, 'Moon': swe.MOON, 'Mars': swe.MARS,
-            'Mercury': swe.MERCURY, 'Jupiter': swe.JUPITER, 'Venus': swe.VENUS,
-            'Saturn': swe.SATURN, 'Rahu': swe.MEAN_NODE, 'Ketu': swe.MEAN_NODE
-        }
+        # 2. Calculate planetary positions (one ephemeris call per body)
+        positions = compute_positions(jd)
 
         planet_data = {}
-        for name, num in planets.items():
-            # Get precise position (true nodes for Rahu/Ketu)
-            flags = swe.FLG_SWIEPH | (swe.FLG_TRUEPOS if name in ['Rahu', 'Ketu'] else 0)
-            pos = swe.calc_ut(jd, num, flags)[0][0]
-            
-            # Convert to sidereal
-            ayanamsa = swe.get_ayanamsa(jd)
-            sid_pos = (pos - ayanamsa) % 360
+        for name, sid_pos, speed in zip(PLANET_ORDER, positions.longitude, positions.speed):
             sign = int(sid_pos // 30) + 1
-            degree = round(sid_pos % 30, 2)
-            
-            # House assignment
-            house = (sign - lagna_sign) % 12 + 1
-            
-            # Retrograde and strength
-            retrograde = swe.calc_ut(jd, num, flags)[0][3] < 0
-            strength = calculate_planetary_strength(name, sign)
-            
             planet_data[name] = {
                 'position': sid_pos,
                 'sign': sign,
-                'degree': degree,
-                'house': house,
-                'retrograde': retrograde,
-                'strength': strength
+                'degree': round(sid_pos % 30, 2),
+                'house': (sign - lagna_sign) % 12 + 1,
+                'retrograde': speed < 0,
+                'strength': calculate_planetary_strength(name, sign)
             }
 
-        # 3. Adjust Rahu/Ketu to be exactly 180° apart
-        planet_data['Ketu']['position'] = (planet_data['Rahu']['position'] + 180) % 360
-        planet_data['Ketu']['sign'] = int(planet_data['Ketu']['position'] // 30) + 1
-        planet_data['Ketu']['degree'] = round(planet_data['Ketu']['position'] % 30, 2)
-        planet_data['Ketu']['house'] = (planet_data['Ketu']['sign'] - lagna_sign) % 12 + 1
-        planet_data['Ketu']['strength'] = calculate_planetary_strength('Ketu', planet_data['Ketu']['sign'])
-
-        # 4. Calculate Dasha periods - THIS IS THE CRITICAL FIX
+        # 3. Calculate Dasha periods - THIS IS THE CRITICAL FIX
         # In the planet calculation section:
         # After calculating planetary positions:
         # After calculating planetary positions:
         moon_long = planet_data['Moon']['position'] % 360
-        print(f"\n=== MOON POSITION VERIFICATION ===")
-        print(f"Absolute Moon longitude: {planet_data['Moon']['position']}°")
-        print(f"Normalized Moon longitude: {moon_long}°")
-        print(f"Moon in {SIGN_NAMES[planet_data['Moon']['sign']-1]} sign")
-        print(f"Moon degree: {planet_data['Moon']['degree']}°")
-        print(f"Moon house: {planet_data['Moon']['house']}")
+        if logger.isEnabledFor(logging.DEBUG):
+            moon = planet_data['Moon']
+            logger.debug("=== MOON POSITION VERIFICATION ===")
+            logger.debug("Absolute Moon longitude: %s°", moon['position'])
+            logger.debug("Normalized Moon longitude: %s°", moon_long)
+            logger.debug("Moon in %s sign", SIGN_NAMES[moon['sign']-1])
+            logger.debug("Moon degree: %s°", moon['degree'])
+            logger.debug("Moon house: %s", moon['house'])
 
         dashas = calculate_vimshottari_dasha(birth_dt, moon_long)
-        return {
+        chart = {
             'planets': planet_data,
             'lagna': {
                 'position': lagna_pos,
@@ -109,10 +106,130 @@ def calculate_vedic_chart(dob, tob, pob):
                 'local': birth_dt.strftime("%d-%m-%Y %I:%M %p"),
                 'utc': utc_dt.strftime("%d-%m-%Y %H:%M UTC")
             },
-            'dashas': dashas  # Now properly defined
+            'dashas': dashas,  # Now properly defined
+            'dasha_timeline': DashaTimeline(jd, moon_long)
         }
+        if use_cache:
+            get_chart_cache().put(cache_key, chart)
+        return chart
 
     except Exception as e:
-        import traceback
-        print(f"\nDEBUG TRACEBACK: {traceback.format_exc()}")  # Detailed error
+        logger.debug("Chart calculation failed", exc_info=True)  # Detailed error
         raise ValueError(f"Chart calculation error: {str(e)}")
+
+
+_EXALTED_SIGNS = np.array([PLANET_STRENGTHS[p]['exalted'] for p in PLANET_ORDER], dtype=np.int8)
+_DEBILITATED_SIGNS = np.array([PLANET_STRENGTHS[p]['debilitated'] for p in PLANET_ORDER], dtype=np.int8)
+
+_UNIX_EPOCH_JD = 2440587.5
+_J2000 = 2451545.0
+
+
+def utc_to_julian_days(utc_timestamps):
+    """Vectorized Julian day (UT) from POSIX timestamps in seconds"""
+    return np.asarray(utc_timestamps, dtype=np.float64) / 86400.0 + _UNIX_EPOCH_JD
+
+
+def calculate_chart_arrays(jd, lat, lon, lagna_index=None, ephemeris_table=None):
+    """Columnar sidereal chart data for arrays of Julian days and coordinates
+
+    By default every distinct Julian day costs one compute_positions call
+    and every distinct (jd, lat, lon) one swe.houses call; real births
+    rarely share either, so this is still a loop per row. For bulk rows
+    pass an EphemerisTable: planets are then interpolated for all rows at
+    once (within the table's max_error_arcsec) and only the house call
+    stays per row. Sweeps over many times at one place can pass that
+    place's LagnaIndex to look the lagna up instead; every row must then
+    be at the index's (rounded) place.
+    """
+    jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+    lat = np.broadcast_to(np.asarray(lat, dtype=np.float64), jd.shape)
+    lon = np.broadcast_to(np.asarray(lon, dtype=np.float64), jd.shape)
+
+    # 1. Planets from the table in one pass, or once per distinct Julian day
+    if ephemeris_table is not None:
+        position, speed = ephemeris_table.positions(jd)
+        # Table speeds are sidereal; retrograde is judged on tropical speed, as in compute_positions
+        retrograde = speed + (swe.get_ayanamsa(_J2000 + 1) - swe.get_ayanamsa(_J2000)) < 0
+    else:
+        unique_jd, jd_inverse = np.unique(jd, return_inverse=True)
+        records = [compute_positions(day) for day in unique_jd.tolist()]
+        jd_inverse = jd_inverse.reshape(-1)
+        position = np.array([r.longitude for r in records])[jd_inverse]
+        retrograde = (np.array([r.speed for r in records]) < 0)[jd_inverse]
+
+    # 2. Lagna once per distinct (jd, lat, lon), or from the place's index
+    if lagna_index is not None:
+        if not (np.all(np.round(lat, 4) == lagna_index.lat) and np.all(np.round(lon, 4) == lagna_index.lon)):
+            raise ValueError(f"lagna_index is for ({lagna_index.lat}, {lagna_index.lon}); "
+                             "every row must be at that place")
+        lagna_sign = lagna_index.signs(jd)
+        lagna_pos = (lagna_sign - 1) * 30.0  # whole sign cusp, as from swe.houses
+    else:
+        keys = np.stack([jd, lat, lon], axis=1)
+        unique_keys, key_inverse = np.unique(keys, axis=0, return_inverse=True)
+        lagna_unique = np.array([swe.houses(k[0], k[1], k[2], b'W')[0][0]
+                                 for k in unique_keys.tolist()])
+        lagna_pos = lagna_unique[key_inverse.reshape(-1)]
+        lagna_sign = (lagna_pos // 30).astype(np.int8) + 1
+
+    # 3. Signs, houses and strength
+    sign = (position // 30).astype(np.int8) + 1
+    house = ((sign - lagna_sign[:, None]) % 12 + 1).astype(np.int8)
+    strength = np.full(sign.shape, '', dtype='<U1')
+    strength[sign == _EXALTED_SIGNS] = 'E'
+    strength[sign == _DEBILITATED_SIGNS] = 'D'
+
+    return {
+        'planets': list(PLANET_ORDER),
+        'jd': jd,
+        'lat': np.asarray(lat, dtype=np.float64).copy(),
+        'lon': np.asarray(lon, dtype=np.float64).copy(),
+        'position': position,
+        'sign': sign,
+        'degree': np.round(position % 30, 2),
+        'house': house,
+        'retrograde': retrograde,
+        'strength': strength,
+        'lagna_position': lagna_pos,
+        'lagna_sign': lagna_sign,
+        'lagna_degree': np.round(lagna_pos % 30, 2)
+    }
+
+
+def calculate_vedic_chart_batch(births, ephemeris_table=None):
+    """Calculate many charts at once from an iterable of (dob, tob, pob)
+
+    Each place is geocoded once per batch and nothing is printed per row;
+    ephemeris_table is passed on to calculate_chart_arrays. Returns the
+    columnar arrays of calculate_chart_arrays plus 'pob'.
+    """
+    births = list(births)
+    if not births:
+        raise ValueError("Chart calculation error: no births given")
+
+    geo_by_place = {}
+    tz_by_name = {}
+    timestamps = np.empty(len(births))
+    lat = np.empty(len(births))
+    lon = np.empty(len(births))
+
+    for row, (dob, tob, pob) in enumerate(births):
+        try:
+            geo = geo_by_place.get(pob)
+            if geo is None:
+                geo = geo_by_place[pob] = get_geo_details(pob)
+            local_tz = tz_by_name.get(geo['tz'])
+            if local_tz is None:
+                local_tz = tz_by_name[geo['tz']] = pytz.timezone(geo['tz'])
+            birth_dt = local_tz.localize(datetime.strptime(f"{dob} {tob}", "%d-%m-%Y %I:%M %p"))
+        except Exception as e:
+            raise ValueError(f"Chart calculation error in row {row} ({dob}, {tob}, {pob}): {str(e)}")
+        timestamps[row] = birth_dt.timestamp()
+        lat[row] = geo['lat']
+        lon[row] = geo['lon']
+
+    result = calculate_chart_arrays(utc_to_julian_days(timestamps), lat, lon, ephemeris_table=ephemeris_table)
+    result['pob'] = np.array([b[2] for b in births], dtype=object)
+    return result
+
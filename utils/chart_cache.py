@@ -0,0 +1,108 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+import pytz
+
+
+def chart_key(utc_dt, lat, lon, ayanamsa, house_system=b'W'):
+    """Canonical content address of a chart calculation"""
+    if isinstance(house_system, bytes):
+        house_system = house_system.decode()
+    canonical = (f"{utc_dt.astimezone(pytz.utc):%Y-%m-%dT%H:%M:%S}|{lat:.4f}|{lon:.4f}|"
+                 f"{ayanamsa:.6f}|{house_system}")
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ChartCache:
+    """LRU of calculated charts with an optional SQLite tier on disk
+
+    Only the time-independent part of a chart is stored: the 'dashas'
+    list depends on the date it was built (current periods, which
+    Pratyantardashas exist), so callers rebuild it on every hit. Cached
+    charts are shared, so treat them as read-only.
+    """
+
+    def __init__(self, path=None, maxsize=2048):
+        self.maxsize = maxsize
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS charts "
+                             "(key TEXT PRIMARY KEY, chart BLOB)")
+            self._db.commit()
+
+    def _remember(self, key, chart):
+        self._memory[key] = chart
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def get(self, key):
+        """Cached chart for key (without 'dashas'), or None on a miss"""
+        with self._lock:
+            chart = self._memory.get(key)
+            if chart is not None:
+                self._memory.move_to_end(key)
+                self._stats['hits'] += 1
+                return chart
+
+            if self._db is not None:
+                row = self._db.execute("SELECT chart FROM charts WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    chart = pickle.loads(row[0])
+                    chart.pop('dashas', None)  # rows written before dashas were left out
+                    self._remember(key, chart)
+                    self._stats['disk_hits'] += 1
+                    return chart
+
+            self._stats['misses'] += 1
+            return None
+
+    def put(self, key, chart):
+        """Store a chart; its date-dependent 'dashas' list is left out"""
+        chart = {name: value for name, value in chart.items() if name != 'dashas'}
+        with self._lock:
+            self._remember(key, chart)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO charts (key, chart) VALUES (?, ?)",
+                                 (key, pickle.dumps(chart, pickle.HIGHEST_PROTOCOL)))
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM charts")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._memory)
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+
+_chart_cache = None
+
+
+def configure_chart_cache(path=None, **kwargs):
+    """Replace the shared chart cache; pass a path to add the on-disk tier"""
+    global _chart_cache
+    _chart_cache = ChartCache(path, **kwargs)
+    return _chart_cache
+
+
+def get_chart_cache():
+    if _chart_cache is None:
+        configure_chart_cache()
+    return _chart_cache
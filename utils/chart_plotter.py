@@ -1,8 +1,12 @@
+import io
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from datetime import datetime
 import pytz
 from .astro_constants import SIGN_NAMES, PLANET_COLORS
+from .dasha_timeline import period_to_dict, datetime_to_jd
 
 # Check for Dropdown widget availability
 try:
@@ -12,25 +16,49 @@ except ImportError:
     HAS_DROPDOWN = False
     print("Note: Your matplotlib version doesn't support Dropdown widget. Using text display only.")
 
+FIGURE_SIZE = (16, 10)
+FIGURE_COLOR = '#FF9933'  # Saffron background
+
 def plot_vedic_chart(chart_data):
     """Create professional North Indian style chart with dasha info panel"""
+    fig = plt.figure(figsize=FIGURE_SIZE, facecolor=FIGURE_COLOR)
+    plt.style.use('default')
+    draw_vedic_chart(fig, chart_data)
+    plt.show()
+
+def render_vedic_chart(chart_data, dpi=80):
+    """PNG bytes of the chart, drawn off-screen on the Agg backend
+
+    Uses a standalone Figure rather than pyplot, so several threads can
+    render at once without a display.
+    """
+    fig = Figure(figsize=FIGURE_SIZE, facecolor=FIGURE_COLOR)
+    FigureCanvasAgg(fig)
+    draw_vedic_chart(fig, chart_data)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, facecolor=fig.get_facecolor())
+    return buffer.getvalue()
+
+def draw_vedic_chart(fig, chart_data):
+    """Draw the chart and dasha panel onto an existing figure"""
     planets = chart_data['planets']
     lagna_sign = chart_data['lagna']['sign']
     current_date = datetime.now(pytz.utc)
     
-    # Get current dasha periods
-    dashas = chart_data['dashas']
-    current_md = next((d for d in dashas if d['type'] == 'Mahadasha' and 
-                      d['start'] <= current_date < d['end']), None)
-    current_ad = next((d for d in dashas if d['type'] == 'Antardasha' and 
-                      d['start'] <= current_date < d['end']), None)
-    current_pd = next((d for d in dashas if d['type'] == 'Pratyantardasha' and 
-                      d['start'] <= current_date < d['end']), None)
+    # Get current dasha periods (bisect lookup when the chart has a timeline)
+    timeline = chart_data.get('dasha_timeline')
+    if timeline is not None:
+        current = [period_to_dict(p) for p in timeline.periods_at(datetime_to_jd(current_date), depth=3)]
+        current_md, current_ad, current_pd = current
+    else:
+        dashas = chart_data['dashas']
+        current_md = next((d for d in dashas if d['type'] == 'Mahadasha' and 
+                          d['start'] <= current_date < d['end']), None)
+        current_ad = next((d for d in dashas if d['type'] == 'Antardasha' and 
+                          d['start'] <= current_date < d['end']), None)
+        current_pd = next((d for d in dashas if d['type'] == 'Pratyantardasha' and 
+                          d['start'] <= current_date < d['end']), None)
 
-    # Create figure with saffron background
-    fig = plt.figure(figsize=(16, 10), facecolor='#FF9933')  # Saffron background
-    plt.style.use('default')
-    
     # Main chart axes (smaller and left-aligned)
     ax = fig.add_axes([0.05, 0.1, 0.6, 0.8], facecolor='#FFF8E7')  # Light saffron
     
@@ -73,8 +101,8 @@ def plot_vedic_chart(chart_data):
             pname = [k for k,v in planets.items() if v == planet][0]
             
             # Planet marker with retrograde indicator
-            marker = 'R' if planet['retrograde'] else 'o'
-            ax.plot(planet_x, planet_y, marker, markersize=12, 
+            marker = '$R$' if planet['retrograde'] else 'o'
+            ax.plot(planet_x, planet_y, marker=marker, linestyle='none', markersize=12, 
                    color=PLANET_COLORS[pname], markeredgecolor='black')
             
             # Planet label with degree and strength indicators
@@ -148,5 +176,3 @@ def plot_vedic_chart(chart_data):
     legend_text = "Indicators: E=Exalted, D=Debilitated, R=Retrograde"
     ax.text(0.5, -0.1, legend_text, 
            ha='center', va='center', transform=ax.transAxes, fontsize=10, color='#8B0000')
-    
-    plt.show()
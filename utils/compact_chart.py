@@ -0,0 +1,149 @@
+import struct
+import sys
+from datetime import datetime
+import numpy as np
+import pytz
+from .astro_constants import PLANET_ORDER
+from .dasha_calculator import calculate_vimshottari_dasha
+from .dasha_timeline import DashaTimeline
+
+# Bits of the per-planet flags field
+FLAG_RETROGRADE = 1
+FLAG_EXALTED = 2
+FLAG_DEBILITATED = 4
+
+# One packed chart: CompactChart keeps it as bytes, bulk storage as a
+# structured array with the same layout, so the two convert without copying
+# field by field.
+CHART_DTYPE = np.dtype([
+    ('position', '<f8', (9,)),
+    ('sign', 'i1', (9,)),
+    ('house', 'i1', (9,)),
+    ('flags', 'u1', (9,)),
+    ('lagna_position', '<f8'),
+    ('houses', '<f8', (12,)),
+    ('lat', '<f8'),
+    ('lon', '<f8'),
+    ('utc_timestamp', '<i8'),
+])
+_LAYOUT = struct.Struct('<9d9b9b9Bd12dddq')
+assert _LAYOUT.size == CHART_DTYPE.itemsize
+
+_UNIX_EPOCH_JD = 2440587.5
+_STRENGTH_FLAGS = {'E': FLAG_EXALTED, 'D': FLAG_DEBILITATED, '': 0}
+
+
+class CompactChart:
+    """Fixed-width chart: one packed bytes record plus shared tz/address strings
+
+    Roughly 300 bytes per chart instead of the nested dict's several KB.
+    to_dict() rebuilds the shape returned by calculate_vedic_chart, with
+    the dasha list regenerated from the birth instant and Moon longitude.
+    """
+
+    __slots__ = ('_data', 'tz', 'address')
+
+    def __init__(self, data, tz, address):
+        self._data = bytes(data)
+        self.tz = sys.intern(tz)
+        self.address = sys.intern(address)
+
+    @classmethod
+    def from_dict(cls, chart):
+        planets = [chart['planets'][name] for name in PLANET_ORDER]
+        flags = [(FLAG_RETROGRADE if p['retrograde'] else 0) | _STRENGTH_FLAGS[p['strength']]
+                 for p in planets]
+        utc_dt = pytz.utc.localize(datetime.strptime(chart['datetime']['utc'], "%d-%m-%Y %H:%M UTC"))
+        data = _LAYOUT.pack(
+            *[p['position'] for p in planets],
+            *[p['sign'] for p in planets],
+            *[p['house'] for p in planets],
+            *flags,
+            chart['lagna']['position'],
+            *chart['houses'],
+            chart['geo']['lat'],
+            chart['geo']['lon'],
+            int(utc_dt.timestamp())
+        )
+        return cls(data, chart['geo']['tz'], chart['geo']['address'])
+
+    @classmethod
+    def from_record(cls, record, tz, address):
+        """CompactChart from one CHART_DTYPE record"""
+        return cls(np.asarray(record, dtype=CHART_DTYPE).tobytes(), tz, address)
+
+    def to_record(self):
+        return np.frombuffer(self._data, dtype=CHART_DTYPE)[0]
+
+    @property
+    def utc_datetime(self):
+        return datetime.fromtimestamp(_LAYOUT.unpack(self._data)[-1], pytz.utc)
+
+    @property
+    def jd(self):
+        return _LAYOUT.unpack(self._data)[-1] / 86400.0 + _UNIX_EPOCH_JD
+
+    def to_dict(self):
+        fields = _LAYOUT.unpack(self._data)
+        positions, signs, houses_of = fields[0:9], fields[9:18], fields[18:27]
+        flags = fields[27:36]
+        lagna_pos = fields[36]
+        houses = tuple(fields[37:49])
+        lat, lon, timestamp = fields[49], fields[50], fields[51]
+
+        utc_dt = datetime.fromtimestamp(timestamp, pytz.utc)
+        birth_dt = utc_dt.astimezone(pytz.timezone(self.tz))
+
+        planet_data = {}
+        for i, name in enumerate(PLANET_ORDER):
+            planet_data[name] = {
+                'position': positions[i],
+                'sign': signs[i],
+                'degree': round(positions[i] % 30, 2),
+                'house': houses_of[i],
+                'retrograde': bool(flags[i] & FLAG_RETROGRADE),
+                'strength': 'E' if flags[i] & FLAG_EXALTED else 'D' if flags[i] & FLAG_DEBILITATED else ''
+            }
+
+        moon_long = positions[1] % 360
+        return {
+            'planets': planet_data,
+            'lagna': {
+                'position': lagna_pos,
+                'sign': int(lagna_pos // 30) + 1,
+                'degree': round(lagna_pos % 30, 2)
+            },
+            'houses': houses,
+            'geo': {'lat': lat, 'lon': lon, 'tz': self.tz, 'address': self.address},
+            'datetime': {
+                'local': birth_dt.strftime("%d-%m-%Y %I:%M %p"),
+                'utc': utc_dt.strftime("%d-%m-%Y %H:%M UTC")
+            },
+            'dashas': calculate_vimshottari_dasha(birth_dt, moon_long),
+            'dasha_timeline': DashaTimeline(timestamp / 86400.0 + _UNIX_EPOCH_JD, moon_long)
+        }
+
+
+def charts_to_records(charts):
+    """Structured CHART_DTYPE array from CompactCharts, one buffer copy"""
+    return np.frombuffer(b''.join(c._data for c in charts), dtype=CHART_DTYPE).copy()
+
+
+def records_from_batch(batch):
+    """CHART_DTYPE array from calculate_chart_arrays / calculate_vedic_chart_batch"""
+    n = len(batch['jd'])
+    records = np.zeros(n, dtype=CHART_DTYPE)
+    records['position'] = batch['position']
+    records['sign'] = batch['sign']
+    records['house'] = batch['house']
+    records['flags'] = (np.where(batch['retrograde'], FLAG_RETROGRADE, 0)
+                        | np.where(batch['strength'] == 'E', FLAG_EXALTED, 0)
+                        | np.where(batch['strength'] == 'D', FLAG_DEBILITATED, 0))
+    records['lagna_position'] = batch['lagna_position']
+    # Whole sign cusps, as swe.houses(..., b'W') returns them
+    first_cusp = (batch['lagna_sign'].astype(np.int64) - 1) * 30
+    records['houses'] = (first_cusp[:, None] + np.arange(12) * 30) % 360
+    records['lat'] = batch['lat']
+    records['lon'] = batch['lon']
+    records['utc_timestamp'] = np.round((batch['jd'] - _UNIX_EPOCH_JD) * 86400).astype(np.int64)
+    return records
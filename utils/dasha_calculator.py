@@ -1,18 +1,26 @@
+import logging
 from datetime import datetime, timedelta
 import pytz
 from .astro_constants import DASHA_PERIODS, DASHA_ORDER, SIGN_NAMES,PLANET_COLORS,PLANET_STRENGTHS
+from .dasha_timeline import DashaTimeline, DASHA_LEVELS, datetime_to_jd, period_to_dict
+
+logger = logging.getLogger(__name__)
 
 def calculate_vimshottari_dasha(birth_dt, moon_longitude):
     """Accurate Vimshottari Dasha calculation that properly covers current date"""
-    print("\n=== DASHA CALCULATION DEBUG ===")
-    print(f"Birth Date (UTC): {birth_dt}")
-    print(f"Moon Longitude: {moon_longitude}°")
+    # Checked once so the per-period trace costs nothing when disabled
+    trace = logger.isEnabledFor(logging.DEBUG)
+    if trace:
+        logger.debug("=== DASHA CALCULATION DEBUG ===")
+        logger.debug("Birth Date (UTC): %s", birth_dt)
+        logger.debug("Moon Longitude: %s°", moon_longitude)
 
     # Constants
     NAKSHATRA_LENGTH = 13.333333333333334  # 13°20'
     TOTAL_YEARS = 120  # Total Vimshottari cycle
     current_date = datetime.now(pytz.utc)
-    print(f"Current Date (UTC): {current_date}")
+    if trace:
+        logger.debug("Current Date (UTC): %s", current_date)
 
     # Calculate nakshatra and elapsed time
     nakshatra_num = int(moon_longitude / NAKSHATRA_LENGTH)
@@ -21,8 +29,9 @@ def calculate_vimshottari_dasha(birth_dt, moon_longitude):
     md_period = DASHA_PERIODS[current_md_planet]
     elapsed_in_dasha = (remainder / NAKSHATRA_LENGTH) * md_period
 
-    print(f"\nMoon in nakshatra {nakshatra_num + 1} ({current_md_planet} mahadasha)")
-    print(f"Elapsed in current dasha: {elapsed_in_dasha:.2f} years")
+    if trace:
+        logger.debug("Moon in nakshatra %d (%s mahadasha)", nakshatra_num + 1, current_md_planet)
+        logger.debug("Elapsed in current dasha: %.2f years", elapsed_in_dasha)
 
     # Calculate the complete dasha sequence until we cover current date
     dashas = []
@@ -44,12 +53,14 @@ def calculate_vimshottari_dasha(birth_dt, moon_longitude):
             'duration_years': period
         })
 
-        print(f"\nMahadasha: {planet} ({period} years)")
-        print(f"From: {period_start} to {period_end}")
-        print(f"Current date in range? {period_start <= current_date < period_end}")
+        if trace:
+            logger.debug("Mahadasha: %s (%s years)", planet, period)
+            logger.debug("From: %s to %s", period_start, period_end)
+            logger.debug("Current date in range? %s", period_start <= current_date < period_end)
 
         # Calculate Antardashas for ALL Mahadashas (not just current)
-        ad_order = DASHA_ORDER[planet_index:] + DASHA_ORDER[:planet_index]
+        md_index = planet_index % 9
+        ad_order = DASHA_ORDER[md_index:] + DASHA_ORDER[:md_index]
         ad_start = period_start
         
         for ad_planet in ad_order:
@@ -68,14 +79,17 @@ def calculate_vimshottari_dasha(birth_dt, moon_longitude):
                 'is_current': is_current_ad  # Flag for current antardasha
             })
             
-            print(f"  Antardasha: {ad_planet} ({ad_period:.2f} years)")
-            print(f"  From: {ad_start} to {ad_end}")
-            print(f"  Current AD? {is_current_ad}")
+            if trace:
+                logger.debug("  Antardasha: %s (%.2f years)", ad_planet, ad_period)
+                logger.debug("  From: %s to %s", ad_start, ad_end)
+                logger.debug("  Current AD? %s", is_current_ad)
 
             # Calculate Pratyantardashas ONLY if this is current Antardasha
             if is_current_ad:
                 pd_start = ad_start
-                for pd_planet in ad_order:
+                ad_index = DASHA_ORDER.index(ad_planet)
+                pd_order = DASHA_ORDER[ad_index:] + DASHA_ORDER[:ad_index]
+                for pd_planet in pd_order:
                     pd_period = (DASHA_PERIODS[pd_planet] * ad_period) / TOTAL_YEARS
                     pd_end = pd_start + timedelta(days=pd_period*365.25)
                     
@@ -89,9 +103,10 @@ def calculate_vimshottari_dasha(birth_dt, moon_longitude):
                         'is_current': (pd_start <= current_date < pd_end)
                     })
                     
-                    print(f"    Pratyantardasha: {pd_planet} ({pd_period:.2f} years)")
-                    print(f"    From: {pd_start} to {pd_end}")
-                    print(f"    Current PD? {pd_start <= current_date < pd_end}")
+                    if trace:
+                        logger.debug("    Pratyantardasha: %s (%.2f years)", pd_planet, pd_period)
+                        logger.debug("    From: %s to %s", pd_start, pd_end)
+                        logger.debug("    Current PD? %s", pd_start <= current_date < pd_end)
                     
                     pd_start = pd_end
             
@@ -108,9 +123,24 @@ def calculate_vimshottari_dasha(birth_dt, moon_longitude):
 
 
 def get_dasha_display_text(dashas, selected_type, current_date):
-    """Find the current running period with exact date comparison"""
+    """Find the current running period with exact date comparison
+
+    `dashas` is either the list from calculate_vimshottari_dasha or a
+    DashaTimeline, which is searched by bisection instead of scanning.
+    """
     current_date = current_date.astimezone(pytz.utc)
-    print(f"\nChecking for current {selected_type} at {current_date}")
+    logger.debug("Checking for current %s at %s", selected_type, current_date)
+
+    if isinstance(dashas, DashaTimeline):
+        level = selected_type.capitalize()
+        if level not in DASHA_LEVELS:
+            return f"No current {selected_type} found"
+        periods = dashas.periods_at(datetime_to_jd(current_date), depth=DASHA_LEVELS.index(level) + 1)
+        current = period_to_dict(periods[-1])
+        # Mirror the list, where only sub-periods carry the is_current flag
+        if level != 'Mahadasha':
+            current['is_current'] = True
+        dashas = [current]
 
     # First pass: Check explicitly marked current periods
     for d in dashas:
@@ -0,0 +1,172 @@
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import datetime, timedelta
+import numpy as np
+import pytz
+from .astro_constants import DASHA_PERIODS, DASHA_ORDER
+
+NAKSHATRA_LENGTH = 13.333333333333334  # 13°20'
+TOTAL_YEARS = 120  # Vimshottari cycle
+YEAR_DAYS = 365.25
+CYCLE_DAYS = TOTAL_YEARS * YEAR_DAYS
+DASHA_LEVELS = ['Mahadasha', 'Antardasha', 'Pratyantardasha', 'Sookshma', 'Prana']
+
+_PERIOD_YEARS = [DASHA_PERIODS[p] for p in DASHA_ORDER]
+
+# Cumulative fraction of a parent period at which each sub-period starts,
+# for sub-sequences beginning at every lord: _SUB_FRACTIONS[k][j] for j in 0..9
+_SUB_FRACTIONS = []
+for _k in range(9):
+    _cum = array('d', [0.0])
+    for _j in range(9):
+        _cum.append(_cum[-1] + _PERIOD_YEARS[(_k + _j) % 9] / TOTAL_YEARS)
+    _cum[-1] = 1.0
+    _SUB_FRACTIONS.append(_cum)
+
+_UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=pytz.utc)
+_UNIX_EPOCH_JD = 2440587.5
+
+DashaPeriod = namedtuple('DashaPeriod', ['level', 'lord', 'start', 'end', 'parent'])
+
+
+def datetime_to_jd(dt):
+    """Julian day (UT) of an aware datetime; naive values are taken as UTC"""
+    if dt.tzinfo is None:
+        dt = pytz.utc.localize(dt)
+    return (dt - _UNIX_EPOCH).total_seconds() / 86400.0 + _UNIX_EPOCH_JD
+
+
+def jd_to_datetime(jd):
+    """UTC datetime of a Julian day (UT)"""
+    return _UNIX_EPOCH + timedelta(days=jd - _UNIX_EPOCH_JD)
+
+
+class DashaTimeline:
+    """Vimshottari periods of one chart as Julian-day boundaries
+
+    Only the nine Mahadasha boundaries of one 120-year cycle are stored;
+    later cycles repeat them and lower levels are derived on demand, so a
+    lookup at any depth is a handful of bisects with nothing materialized.
+    """
+
+    __slots__ = ('birth_jd', 'moon_longitude', 'first_lord', 'md_bounds')
+
+    def __init__(self, birth_jd, moon_longitude):
+        nakshatra_num = int(moon_longitude / NAKSHATRA_LENGTH)
+        remainder = moon_longitude % NAKSHATRA_LENGTH
+        self.birth_jd = birth_jd
+        self.moon_longitude = moon_longitude
+        self.first_lord = nakshatra_num % 9
+
+        elapsed_years = (remainder / NAKSHATRA_LENGTH) * _PERIOD_YEARS[self.first_lord]
+        start = birth_jd - elapsed_years * YEAR_DAYS
+        self.md_bounds = array('d', (start + f * CYCLE_DAYS for f in _SUB_FRACTIONS[self.first_lord]))
+
+    def _mahadasha(self, jd):
+        """(lord index, start, end) of the Mahadasha running at jd"""
+        cycle_start = self.md_bounds[0]
+        cycle, offset = divmod(jd - cycle_start, CYCLE_DAYS)
+        i = bisect_right(self.md_bounds, cycle_start + offset) - 1
+        i = min(max(i, 0), 8)
+        shift = cycle * CYCLE_DAYS
+        return (self.first_lord + i) % 9, self.md_bounds[i] + shift, self.md_bounds[i + 1] + shift
+
+    def period_indices(self, jd, depth=2):
+        """[(lord index, start, end), ...] from Mahadasha down to `depth` levels"""
+        lord, start, end = self._mahadasha(jd)
+        result = [(lord, start, end)]
+        for _ in range(depth - 1):
+            fractions = _SUB_FRACTIONS[lord]
+            length = end - start
+            j = bisect_right(fractions, (jd - start) / length) - 1
+            j = min(max(j, 0), 8)
+            lord, start, end = (lord + j) % 9, start + fractions[j] * length, start + fractions[j + 1] * length
+            result.append((lord, start, end))
+        return result
+
+    def lords_at(self, jd, depth=2):
+        """Names of the running lords, e.g. ('Saturn', 'Mercury') for depth 2"""
+        return tuple(DASHA_ORDER[lord] for lord, _, _ in self.period_indices(jd, depth))
+
+    def periods_at(self, jd, depth=3):
+        """DashaPeriod for every level down to `depth` running at jd"""
+        periods = []
+        parent = None
+        for level, (lord, start, end) in enumerate(self.period_indices(jd, depth)):
+            periods.append(DashaPeriod(DASHA_LEVELS[level], DASHA_ORDER[lord], start, end, parent))
+            parent = DASHA_ORDER[lord]
+        return periods
+
+    def mahadashas(self, start_jd, end_jd):
+        """Mahadashas overlapping [start_jd, end_jd), in order"""
+        lord, start, end = self._mahadasha(start_jd)
+        while start < end_jd:
+            yield DashaPeriod('Mahadasha', DASHA_ORDER[lord], start, end, None)
+            lord = (lord + 1) % 9
+            start, end = end, end + _PERIOD_YEARS[lord] * YEAR_DAYS
+
+
+def period_to_dict(period):
+    """DashaPeriod in the dict shape produced by calculate_vimshottari_dasha"""
+    data = {
+        'type': period.level,
+        'planet': period.lord,
+        'start': jd_to_datetime(period.start),
+        'end': jd_to_datetime(period.end),
+        'duration_years': (period.end - period.start) / YEAR_DAYS
+    }
+    if period.parent is not None:
+        data['parent'] = period.parent
+    return data
+
+
+# Start of each lord's Mahadasha within a cycle that begins with Ketu (years)
+_CYCLE_STARTS = np.concatenate([[0.0], np.cumsum(_PERIOD_YEARS, dtype=np.float64)])
+_PERIODS = np.array(_PERIOD_YEARS, dtype=np.float64)
+
+
+def vimshottari_lords(birth_jd, moon_longitude, query_jd, depth=2):
+    """Running dasha lords for every chart x query date, as DASHA_ORDER indices
+
+    birth_jd and moon_longitude are per-chart arrays, query_jd an array of
+    dates (all Julian days, UT). Returns an int8 array of shape
+    (charts, dates, depth); [..., 0] is the Mahadasha lord, [..., 1] the
+    Antardasha lord and so on.
+
+    Every level is resolved the same way: a position in the 120-year cycle
+    is located in _CYCLE_STARTS, then the offset into that lord's period is
+    stretched by 120 / period back onto a cycle that starts at the lord.
+    """
+    birth_jd = np.asarray(birth_jd, dtype=np.float64).reshape(-1, 1)
+    moon_longitude = np.asarray(moon_longitude, dtype=np.float64).reshape(-1, 1)
+    query_jd = np.asarray(query_jd, dtype=np.float64).reshape(1, -1)
+
+    nakshatra = (moon_longitude // NAKSHATRA_LENGTH).astype(np.int64)
+    first_lord = nakshatra % 9
+    elapsed = (moon_longitude % NAKSHATRA_LENGTH) / NAKSHATRA_LENGTH * _PERIODS[first_lord]
+    position = np.mod(_CYCLE_STARTS[first_lord] + elapsed + (query_jd - birth_jd) / YEAR_DAYS, TOTAL_YEARS)
+
+    lords = np.empty(position.shape + (depth,), dtype=np.int8)
+    for level in range(depth):
+        lord = np.clip(np.searchsorted(_CYCLE_STARTS, position, side='right') - 1, 0, 8)
+        lords[..., level] = lord
+        if level + 1 < depth:
+            offset = (position - _CYCLE_STARTS[lord]) * (TOTAL_YEARS / _PERIODS[lord])
+            position = np.mod(_CYCLE_STARTS[lord] + offset, TOTAL_YEARS)
+    return lords
+
+
+def mahadasha_offsets(moon_longitude):
+    """(lords, start offsets in days from birth) of the nine Mahadashas from birth
+
+    moon_longitude is a per-chart array; both results have shape (charts, 9); the first start is zero or negative, the
+    part of the birth Mahadasha that elapsed before birth.
+    """
+    moon_longitude = np.atleast_1d(np.asarray(moon_longitude, dtype=np.float64))
+    first_lord = (moon_longitude // NAKSHATRA_LENGTH).astype(np.int64) % 9
+    elapsed = (moon_longitude % NAKSHATRA_LENGTH) / NAKSHATRA_LENGTH * _PERIODS[first_lord]
+
+    lords = (first_lord[:, None] + np.arange(9)) % 9
+    years = np.mod(_CYCLE_STARTS[lords] - _CYCLE_STARTS[first_lord][:, None], TOTAL_YEARS)
+    return lords.astype(np.int8), (years - elapsed[:, None]) * YEAR_DAYS
@@ -0,0 +1,37 @@
+import swisseph as swe
+from collections import namedtuple
+from .astro_constants import PLANET_ORDER
+
+# Swiss Ephemeris body per planet; Ketu has none and is derived from Rahu
+PLANET_BODIES = {
+    'Sun': swe.SUN, 'Moon': swe.MOON, 'Mars': swe.MARS,
+    'Mercury': swe.MERCURY, 'Jupiter': swe.JUPITER, 'Venus': swe.VENUS,
+    'Saturn': swe.SATURN, 'Rahu': swe.MEAN_NODE
+}
+CALC_FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED
+
+# Sidereal longitudes and daily speeds in PLANET_ORDER for one instant
+EphemerisRecord = namedtuple('EphemerisRecord', ['jd', 'ayanamsa', 'longitude', 'speed'])
+
+
+def calc_body(jd, body):
+    """Tropical (longitude, speed) of one body with a single calc_ut call"""
+    flags = CALC_FLAGS | (swe.FLG_TRUEPOS if body == swe.MEAN_NODE else 0)
+    xx = swe.calc_ut(jd, body, flags)[0]
+    return xx[0], xx[3]
+
+
+def compute_positions(jd):
+    """One calc_ut per body and one ayanamsa lookup for a Julian day (UT)"""
+    ayanamsa = swe.get_ayanamsa(jd)
+    longitude = []
+    speed = []
+    for name in PLANET_ORDER[:-1]:
+        lon, spd = calc_body(jd, PLANET_BODIES[name])
+        longitude.append((lon - ayanamsa) % 360)
+        speed.append(spd)
+
+    # Ketu is exactly opposite Rahu and moves with it
+    longitude.append((longitude[-1] + 180) % 360)
+    speed.append(speed[-1])
+    return EphemerisRecord(jd, ayanamsa, tuple(longitude), tuple(speed))
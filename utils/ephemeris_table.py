@@ -0,0 +1,147 @@
+import json
+import os
+import numpy as np
+import swisseph as swe
+from .astro_constants import PLANET_ORDER
+from .ephemeris import compute_positions
+
+DEFAULT_TABLE_PATH = os.path.join("ephemeris_data", "sidereal_hourly")
+
+# Julian days of 1900-01-01 and 2100-01-01, 0h UT
+JD_1900 = 2415020.5
+JD_2100 = 2488069.5
+
+
+def _hermite(p0, p1, m0, m1, s, h):
+    """Cubic Hermite value on [0, 1] with step h (in days)"""
+    s2 = s * s
+    s3 = s2 * s
+    return ((2 * s3 - 3 * s2 + 1) * p0 + (s3 - 2 * s2 + s) * h * m0
+            + (-2 * s3 + 3 * s2) * p1 + (s3 - s2) * h * m1)
+
+
+def build_ephemeris_table(path=DEFAULT_TABLE_PATH, start_jd=JD_1900, end_jd=JD_2100,
+                          step_days=1 / 24, validation_samples=20000, sid_mode=swe.SIDM_LAHIRI):
+    """Sample sidereal longitudes and speeds of the nine grahas on a fixed grid
+
+    Writes `<path>.npy` (float32, shape (steps, 9, 2): longitude, speed) and
+    `<path>.json` with the grid, the sidereal mode and the largest
+    interpolation error found at `validation_samples` random instants, in
+    arc-seconds per planet. Sets sid_mode globally, as app.py does.
+    """
+    swe.set_sid_mode(sid_mode)
+    count = int(np.ceil((end_jd - start_jd) / step_days)) + 1
+    grid = start_jd + np.arange(count) * step_days
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    table = np.lib.format.open_memmap(path + ".npy", mode="w+", dtype=np.float32,
+                                      shape=(count, len(PLANET_ORDER), 2))
+    ayanamsa = np.empty(count)
+    for row, jd in enumerate(grid.tolist()):
+        record = compute_positions(jd)
+        table[row, :, 0] = record.longitude
+        table[row, :, 1] = record.speed
+        ayanamsa[row] = record.ayanamsa
+
+    # Swiss Ephemeris speeds are tropical; remove the ayanamsa drift
+    table[:, :, 1] -= np.gradient(ayanamsa, step_days)[:, None].astype(np.float32)
+    table.flush()
+    del table
+
+    meta = {
+        "start_jd": start_jd,
+        "step_days": step_days,
+        "count": count,
+        "planets": list(PLANET_ORDER),
+        "sid_mode": sid_mode,
+        "ayanamsa_name": swe.get_ayanamsa_name(sid_mode),
+        "ayanamsa_at_start": float(ayanamsa[0]),
+    }
+    with open(path + ".json", "w") as f:
+        json.dump(meta, f, indent=2)
+
+    if validation_samples:
+        max_error = EphemerisTable(path).measure_error(validation_samples)
+        meta["max_error_arcsec"] = dict(zip(PLANET_ORDER, max_error.tolist()))
+        with open(path + ".json", "w") as f:
+            json.dump(meta, f, indent=2)
+    return meta
+
+
+class EphemerisTable:
+    """Memory-mapped sidereal ephemeris table with Hermite interpolation
+
+    The table is opened read-only with mmap, so worker processes reading
+    the same file share one copy in the page cache. Its longitudes are in
+    the sidereal mode it was built with, so opening it while another mode
+    is set raises ValueError.
+    """
+
+    def __init__(self, path=DEFAULT_TABLE_PATH):
+        with open(path + ".json") as f:
+            self.meta = json.load(f)
+        ayanamsa = swe.get_ayanamsa(self.meta["start_jd"])
+        if abs(ayanamsa - self.meta["ayanamsa_at_start"]) > 1e-6:
+            raise ValueError(f"Ephemeris table {path} was built for the "
+                             f"{self.meta.get('ayanamsa_name', 'another')} ayanamsa "
+                             f"({self.meta['ayanamsa_at_start']:.6f}°), but the current sidereal mode "
+                             f"gives {ayanamsa:.6f}°; call swe.set_sid_mode or rebuild the table")
+        self.data = np.load(path + ".npy", mmap_mode="r")
+        self.start_jd = self.meta["start_jd"]
+        self.step_days = self.meta["step_days"]
+        self.end_jd = self.start_jd + (len(self.data) - 1) * self.step_days
+        self.planets = self.meta["planets"]
+
+    @property
+    def max_error_arcsec(self):
+        """Largest validated interpolation error per planet, if measured"""
+        return self.meta.get("max_error_arcsec")
+
+    def positions(self, jd):
+        """Sidereal (longitude, speed) arrays of shape (len(jd), 9) at jd (UT)"""
+        jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+        if jd.min() < self.start_jd or jd.max() > self.end_jd:
+            raise ValueError(f"Ephemeris table covers JD {self.start_jd} to {self.end_jd}")
+
+        x = (jd - self.start_jd) / self.step_days
+        row = np.minimum(x.astype(np.int64), len(self.data) - 2)
+        s = (x - row)[:, None]
+        lo = np.asarray(self.data[row], dtype=np.float64)
+        hi = np.asarray(self.data[row + 1], dtype=np.float64)
+
+        p0, m0 = lo[:, :, 0], lo[:, :, 1]
+        p1 = p0 + (hi[:, :, 0] - p0 + 180) % 360 - 180  # unwrap across 0°
+        m1 = hi[:, :, 1]
+        longitude = _hermite(p0, p1, m0, m1, s, self.step_days)
+        # Speed interpolated from the sampled speeds, not the Hermite slope:
+        # that divides float32 longitude rounding (~2e-5°) by the step and
+        # can flip the sign of the speed near a station
+        return longitude % 360, m0 + (m1 - m0) * s
+
+    def measure_error(self, samples=20000, seed=0):
+        """Max |interpolated - Swiss Ephemeris| in arc-seconds at random instants"""
+        rng = np.random.default_rng(seed)
+        jd = rng.uniform(self.start_jd, self.end_jd, samples)
+        longitude, _ = self.positions(jd)
+        exact = np.array([compute_positions(t).longitude for t in jd.tolist()])
+        error = np.abs((longitude - exact + 180) % 360 - 180)
+        return error.max(axis=0) * 3600
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the sidereal ephemeris table")
+    parser.add_argument("--out", default=DEFAULT_TABLE_PATH)
+    parser.add_argument("--start-jd", type=float, default=JD_1900)
+    parser.add_argument("--end-jd", type=float, default=JD_2100)
+    parser.add_argument("--step-hours", type=float, default=1.0)
+    parser.add_argument("--sid-mode", type=int, default=swe.SIDM_LAHIRI,
+                        help="Swiss Ephemeris sidereal mode (default Lahiri, as app.py)")
+    args = parser.parse_args()
+
+    meta = build_ephemeris_table(args.out, args.start_jd, args.end_jd, args.step_hours / 24,
+                                 sid_mode=args.sid_mode)
+    print(f"Wrote {meta['count']} rows to {args.out}.npy ({meta['ayanamsa_name']} ayanamsa)")
+    for planet, error in meta["max_error_arcsec"].items():
+        print(f"  {planet:<8} max error {error:.3f}\"")
@@ -0,0 +1,176 @@
+import os
+import re
+import unicodedata
+from bisect import bisect_left
+
+# Bundled GeoNames extract (cities with population > 15000)
+GEO_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "geo_data")
+DEFAULT_CITIES_FILE = os.environ.get("VASHISTH_GAZETTEER", os.path.join(GEO_DATA_DIR, "cities15000.txt"))
+DEFAULT_COUNTRIES_FILE = os.path.join(GEO_DATA_DIR, "countryInfo.txt")
+DEFAULT_ADMIN1_FILE = os.path.join(GEO_DATA_DIR, "admin1CodesASCII.txt")
+
+# Shortest city name prefix accepted, and only when it names a single place
+MIN_PREFIX_LENGTH = 4
+
+# Column positions in the GeoNames "geoname" table dump
+COL_NAME, COL_ASCIINAME, COL_ALTNAMES = 1, 2, 3
+COL_LAT, COL_LON, COL_COUNTRY, COL_ADMIN1 = 4, 5, 8, 10
+COL_POPULATION, COL_TIMEZONE = 14, 17
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_place_name(name):
+    """Lowercase, accent-free, punctuation-free form used as index key"""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return _NON_ALNUM.sub(" ", name.lower()).strip()
+
+
+class Gazetteer:
+    """In-memory place name index built from GeoNames-style TSV files
+
+    A region between city and country ("Springfield, Illinois, USA") must
+    match the city's admin1 code, or its name from admin1CodesASCII.txt
+    when that file is present; lookups that cannot be matched return None
+    so the online geocoder gets them.
+    """
+
+    def __init__(self, cities_file=DEFAULT_CITIES_FILE, countries_file=DEFAULT_COUNTRIES_FILE,
+                 admin1_file=DEFAULT_ADMIN1_FILE):
+        self.names = []
+        self.lat = []
+        self.lon = []
+        self.country = []
+        self.admin1 = []
+        self.population = []
+        self.tz = []
+        self.country_names = {}     # ISO code -> display name
+        self._country_codes = {}    # normalized name/ISO2/ISO3 -> ISO code
+        self._admin1_names = {}     # (ISO code, admin1 code) -> normalized names
+        self._by_name = {}          # normalized name -> row ids, most populous first
+        self._sorted_keys = []
+
+        if countries_file and os.path.exists(countries_file):
+            self._load_countries(countries_file)
+        if admin1_file and os.path.exists(admin1_file):
+            self._load_admin1(admin1_file)
+        self._load_cities(cities_file)
+
+    def _load_countries(self, path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#") or not line.strip():
+                    continue
+                cols = line.rstrip("\n").split("\t")
+                iso, iso3, name = cols[0], cols[1], cols[4]
+                self.country_names[iso] = name
+                for key in (iso, iso3, name):
+                    self._country_codes[normalize_place_name(key)] = iso
+
+    def _load_admin1(self, path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                cols = line.rstrip("\n").split("\t")
+                if len(cols) < 3 or "." not in cols[0]:
+                    continue
+                country, code = cols[0].split(".", 1)
+                self._admin1_names[(country, code)] = {normalize_place_name(cols[1]),
+                                                       normalize_place_name(cols[2])}
+
+    def _load_cities(self, path):
+        by_name = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#") or not line.strip():
+                    continue
+                cols = line.rstrip("\n").split("\t")
+                if not cols[COL_TIMEZONE]:
+                    continue
+                row = len(self.names)
+                self.names.append(cols[COL_NAME])
+                self.lat.append(float(cols[COL_LAT]))
+                self.lon.append(float(cols[COL_LON]))
+                self.country.append(cols[COL_COUNTRY])
+                self.admin1.append(cols[COL_ADMIN1])
+                self.population.append(int(cols[COL_POPULATION] or 0))
+                self.tz.append(cols[COL_TIMEZONE])
+
+                keys = {normalize_place_name(cols[COL_NAME]), normalize_place_name(cols[COL_ASCIINAME])}
+                if cols[COL_ALTNAMES]:
+                    keys.update(normalize_place_name(a) for a in cols[COL_ALTNAMES].split(","))
+                for key in keys:
+                    if key:
+                        by_name.setdefault(key, []).append(row)
+
+        for rows in by_name.values():
+            rows.sort(key=lambda r: -self.population[r])
+        self._by_name = by_name
+        self._sorted_keys = sorted(by_name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _prefix_rows(self, key):
+        """Row ids of every key starting with key, most populous first"""
+        rows = set()
+        i = bisect_left(self._sorted_keys, key)
+        while i < len(self._sorted_keys) and self._sorted_keys[i].startswith(key):
+            rows.update(self._by_name[self._sorted_keys[i]])
+            i += 1
+        return sorted(rows, key=lambda r: -self.population[r])
+
+    def _in_region(self, row, region):
+        admin1 = self.admin1[row]
+        return region == normalize_place_name(admin1) or \
+            region in self._admin1_names.get((self.country[row], admin1), ())
+
+    def _matches(self, row, country, regions):
+        if country and self.country[row] != country:
+            return False
+        return all(self._in_region(row, region) for region in regions)
+
+    def lookup(self, place):
+        """Resolve "City[, Region], Country" to a geo dict, or None if unknown or ambiguous"""
+        parts = [normalize_place_name(p) for p in place.split(",")]
+        parts = [p for p in parts if p]
+        if not parts:
+            return None
+
+        city = parts[0]
+        country = self._country_codes.get(parts[-1]) if len(parts) > 1 else None
+        regions = parts[1:-1] if country else parts[1:]
+        bare_country = len(parts) == 1 and city in self._country_codes
+        if bare_country:
+            # A bare country name only resolves to a city of that name inside it (Singapore)
+            country = self._country_codes[city]
+
+        rows = [r for r in self._by_name.get(city, ()) if self._matches(r, country, regions)]
+        if not rows and not bare_country and len(city) >= MIN_PREFIX_LENGTH:
+            # A prefix only counts when it names exactly one place
+            rows = [r for r in self._prefix_rows(city) if self._matches(r, country, regions)]
+            if len(rows) != 1:
+                return None
+        if not rows:
+            return None
+
+        row = rows[0]
+        address = self.names[row]
+        if self.country[row] in self.country_names:
+            address += f", {self.country_names[self.country[row]]}"
+        return {
+            'lat': round(self.lat[row], 4),
+            'lon': round(self.lon[row], 4),
+            'tz': self.tz[row],
+            'address': address
+        }
+
+
+_default_gazetteer = None
+
+
+def get_gazetteer():
+    """Shared gazetteer over the bundled dataset, loaded on first use"""
+    global _default_gazetteer
+    if _default_gazetteer is None:
+        _default_gazetteer = Gazetteer()
+    return _default_gazetteer
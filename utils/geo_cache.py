@@ -0,0 +1,116 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from .gazetteer import normalize_place_name
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "VASHISTH_GEO_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "vashisth", "geocode_cache.sqlite")
+)
+
+# Marker stored for places that could not be resolved
+NOT_FOUND = None
+
+
+class GeoCache:
+    """Two-tier place cache: in-process LRU in front of an optional SQLite file
+
+    Holds online geocoder answers: geo dicts, or NOT_FOUND for negative
+    results. Entries expire after `ttl` seconds (`negative_ttl` for
+    negative results); None disables expiry.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, maxsize=10000, ttl=30 * 86400, negative_ttl=86400):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'negative_hits': 0,
+                       'evictions': 0, 'expired': 0}
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            # The old table also held gazetteer answers under comma-less keys
+            self._db.execute("DROP TABLE IF EXISTS geocode")
+            self._db.execute("CREATE TABLE IF NOT EXISTS online_geocode "
+                             "(key TEXT PRIMARY KEY, value TEXT, expires_at REAL)")
+            self._db.commit()
+
+    @staticmethod
+    def make_key(place):
+        """Normalized place with its comma structure kept ("springfield,illinois")"""
+        parts = (normalize_place_name(part) for part in place.split(","))
+        return ",".join(part for part in parts if part)
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def get(self, place):
+        """Return (found, value); value is NOT_FOUND for cached negatives"""
+        key = self.make_key(place)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] is None or entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self._stats['hits'] += 1
+                    if entry[1] is NOT_FOUND:
+                        self._stats['negative_hits'] += 1
+                    return True, entry[1]
+                del self._memory[key]
+                self._stats['expired'] += 1
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, expires_at FROM online_geocode WHERE key = ?",
+                                       (key,)).fetchone()
+                if row is not None:
+                    if row[1] is None or row[1] > now:
+                        value = json.loads(row[0])
+                        self._remember(key, row[1], value)
+                        self._stats['disk_hits'] += 1
+                        if value is NOT_FOUND:
+                            self._stats['negative_hits'] += 1
+                        return True, value
+                    self._db.execute("DELETE FROM online_geocode WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._stats['expired'] += 1
+
+            self._stats['misses'] += 1
+            return False, None
+
+    def put(self, place, value):
+        key = self.make_key(place)
+        ttl = self.negative_ttl if value is NOT_FOUND else self.ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO online_geocode VALUES (?, ?, ?)",
+                                 (key, json.dumps(value), expires_at))
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM online_geocode")
+                self._db.commit()
+
+    def stats(self):
+        """Hit/miss counters plus current memory tier size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._memory)
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
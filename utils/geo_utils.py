@@ -1,18 +1,48 @@
-from geopy.geocoders import Nominatim
-from timezonefinder import TimezoneFinder
-import pytz
+from .gazetteer import get_gazetteer
+from .geo_cache import GeoCache, DEFAULT_CACHE_PATH, NOT_FOUND
 
-def get_geo_details(pob):
-    """Get verified location data with error handling"""
-    geolocator = Nominatim(user_agent="professional_vedic_astrology")
+# Query Nominatim for places missing from the offline gazetteer
+USE_NOMINATIM_FALLBACK = True
+
+_geolocator = None
+_timezone_finder = None
+_geo_cache = None
+
+
+def _online_clients():
+    """Nominatim client and TimezoneFinder, created once per process"""
+    global _geolocator, _timezone_finder
+    if _geolocator is None:
+        from geopy.geocoders import Nominatim
+        from timezonefinder import TimezoneFinder
+        _geolocator = Nominatim(user_agent="professional_vedic_astrology")
+        _timezone_finder = TimezoneFinder()
+    return _geolocator, _timezone_finder
+
+
+def configure_geo_cache(path=DEFAULT_CACHE_PATH, **kwargs):
+    """Replace the shared geocode cache (path=None keeps it in memory only)"""
+    global _geo_cache
+    _geo_cache = GeoCache(path, **kwargs)
+    return _geo_cache
+
+
+def get_geo_cache():
+    if _geo_cache is None:
+        configure_geo_cache()
+    return _geo_cache
+
+
+def _online_lookup(pob):
+    """Nominatim lookup; returns None when the place does not exist"""
     try:
+        geolocator, tf = _online_clients()
         location = geolocator.geocode(pob, timeout=10)
         if not location:
-            raise ValueError("Location not found")
-        
-        tf = TimezoneFinder()
+            return None
+
         timezone_str = tf.timezone_at(lng=location.longitude, lat=location.latitude)
-        
+
         return {
             'lat': round(location.latitude, 4),
             'lon': round(location.longitude, 4),
@@ -21,3 +51,26 @@ def get_geo_details(pob):
         }
     except Exception as e:
         raise ValueError(f"Geocoding error: {str(e)}")
+
+
+def get_geo_details(pob, online_fallback=None):
+    """Get verified location data with error handling"""
+    if online_fallback is None:
+        online_fallback = USE_NOMINATIM_FALLBACK
+
+    # The gazetteer is an in-memory lookup, so its answers are never cached
+    place = get_gazetteer().lookup(pob)
+    if place:
+        return place
+
+    cache = get_geo_cache()
+    found, place = cache.get(pob)
+    if not found:
+        if not online_fallback:
+            raise ValueError("Geocoding error: Location not found")
+        place = _online_lookup(pob)
+        cache.put(pob, place)
+
+    if place is NOT_FOUND:
+        raise ValueError("Geocoding error: Location not found")
+    return dict(place)
@@ -0,0 +1,156 @@
+"""Precomputed lagna (ascendant) sign changes for one birthplace
+
+The ascendant passes through all twelve signs each sidereal day. For a
+(lat, lon) cell it is sampled every STEP_MINUTES in blocks of BLOCK_DAYS;
+each sign change is refined to a second by root-finding and each block is
+cached on disk. The lagna sign at any instant is then a binary search over
+the change instants, and the ascendant degree a linear interpolation of the
+samples: within about 5" of swe.houses at the default step for mid
+latitudes, nearer 90" at 60° where the ascendant speeds up (measure_error).
+"""
+import os
+import numpy as np
+import swisseph as swe
+from .transit_events import find_root
+
+BLOCK_DAYS = 16
+STEP_MINUTES = 4
+DEFAULT_CACHE_DIR = os.path.join("ephemeris_data", "lagna")
+_BLOCK_EPOCH = 2451544.5  # 2000-01-01 0h UT, start of block 0
+_J2000 = 2451545.0
+
+# The ascendant is not continuous inside the polar circles
+MAX_LATITUDE = 66.0
+
+
+def _wrap180(degrees):
+    return (degrees + 180) % 360 - 180
+
+
+def ascendant(jd, lat, lon, sidereal=False):
+    """Ascendant longitude from swe.houses; tropical by default like calculate_vedic_chart's lagna"""
+    asc = swe.houses(jd, lat, lon, b'W')[1][0]
+    return (asc - swe.get_ayanamsa(jd)) % 360 if sidereal else asc
+
+
+class LagnaIndex:
+    """Lagna sign and degree lookups for one (lat, lon), built lazily per block
+
+    Coordinates are rounded to 4 decimals, as in the chart cache key.
+    sidereal=False matches the lagna sign of calculate_vedic_chart, which
+    takes the whole-sign cusp of the tropical ascendant.
+    """
+
+    def __init__(self, lat, lon, sidereal=False, cache_dir=DEFAULT_CACHE_DIR, step_minutes=STEP_MINUTES):
+        if abs(lat) > MAX_LATITUDE:
+            raise ValueError(f"Latitude {lat} is inside a polar circle; the ascendant is not continuous there")
+        self.lat = round(lat, 4)
+        self.lon = round(lon, 4)
+        self.sidereal = sidereal
+        self.cache_dir = cache_dir
+        self.step = step_minutes / 1440
+        self.samples_per_block = int(round(BLOCK_DAYS / self.step))
+        self._blocks = {}
+
+    def _ascendant(self, jd):
+        return ascendant(jd, self.lat, self.lon, self.sidereal)
+
+    def _frame(self):
+        """Tropical, or sidereal tagged with the current mode's ayanamsa at J2000"""
+        return f"sid{swe.get_ayanamsa(_J2000):.6f}" if self.sidereal else "trop"
+
+    def _block_path(self, frame, block):
+        name = f"{self.lat:+.4f}_{self.lon:+.4f}_{frame}_{self.step * 1440:g}m_{block}.npz"
+        return os.path.join(self.cache_dir, name)
+
+    def _build_block(self, block):
+        start = _BLOCK_EPOCH + block * BLOCK_DAYS
+        times = start + np.arange(self.samples_per_block + 1) * self.step
+        samples = np.degrees(np.unwrap(np.radians([self._ascendant(jd) for jd in times.tolist()])))
+
+        crossings = []
+        entered = []
+        sign_index = np.floor(samples / 30).astype(np.int64)
+        for i in np.flatnonzero(np.diff(sign_index)).tolist():
+            boundary = (sign_index[i + 1] * 30) % 360
+            f = lambda jd: _wrap180(self._ascendant(jd) - boundary)
+            crossings.append(find_root(f, times[i], times[i + 1],
+                                       _wrap180(samples[i] - boundary), _wrap180(samples[i + 1] - boundary)))
+            entered.append(sign_index[i + 1] % 12 + 1)
+        return {
+            "samples": samples,
+            "crossings": np.array(crossings, dtype=np.float64),
+            "signs": np.array(entered, dtype=np.int8),
+            "first_sign": np.int8(sign_index[0] % 12 + 1),
+        }
+
+    def block(self, block):
+        """Arrays of one block, from memory, the disk cache or a fresh build"""
+        key = (self._frame(), block)
+        if key not in self._blocks:
+            path = self._block_path(*key) if self.cache_dir else None
+            if path and os.path.exists(path):
+                with np.load(path) as data:
+                    arrays = {name: data[name] for name in data.files}
+            else:
+                arrays = self._build_block(block)
+                if path:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    np.savez(path, **arrays)
+            self._blocks[key] = arrays
+        return self._blocks[key]
+
+    def _by_block(self, jd, lookup):
+        jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+        block_ids = np.floor((jd - _BLOCK_EPOCH) / BLOCK_DAYS).astype(np.int64)
+        result = None
+        for block in np.unique(block_ids).tolist():
+            rows = block_ids == block
+            values = lookup(self.block(block), jd[rows], _BLOCK_EPOCH + block * BLOCK_DAYS)
+            if result is None:
+                result = np.empty(jd.shape, dtype=values.dtype)
+            result[rows] = values
+        return result
+
+    def signs(self, jd):
+        """Lagna sign (1-12) at each Julian day (UT)"""
+        def lookup(data, times, _):
+            signs = np.concatenate([[data["first_sign"]], data["signs"]]).astype(np.int8)
+            return signs[np.searchsorted(data["crossings"], times, side="right")]
+        return self._by_block(jd, lookup)
+
+    def longitudes(self, jd):
+        """Ascendant longitude at each Julian day (UT), interpolated between samples"""
+        def lookup(data, times, start):
+            position = (times - start) / self.step
+            i = np.minimum(position.astype(np.int64), self.samples_per_block - 1)
+            s = position - i
+            samples = data["samples"]
+            return (samples[i] * (1 - s) + samples[i + 1] * s) % 360
+        return self._by_block(jd, lookup)
+
+    def degrees(self, jd):
+        """Ascendant degree within its sign"""
+        return self.longitudes(jd) % 30
+
+    def lagna(self, jd):
+        """(sign, degree) at one Julian day"""
+        return int(self.signs(jd)[0]), float(self.degrees(jd)[0])
+
+    def sign_changes(self, start_jd, end_jd):
+        """(instants, signs entered) of every lagna change in [start_jd, end_jd)"""
+        first = int(np.floor((start_jd - _BLOCK_EPOCH) / BLOCK_DAYS))
+        last = int(np.floor((end_jd - _BLOCK_EPOCH) / BLOCK_DAYS))
+        blocks = [self.block(b) for b in range(first, last + 1)]
+        times = np.concatenate([b["crossings"] for b in blocks])
+        signs = np.concatenate([b["signs"] for b in blocks])
+        keep = (times >= start_jd) & (times < end_jd)
+        return times[keep], signs[keep]
+
+    def measure_error(self, start_jd, end_jd, samples=2000, seed=0):
+        """Largest degree error in arc-seconds and sign mismatches against swe.houses"""
+        jd = np.random.default_rng(seed).uniform(start_jd, end_jd, samples)
+        truth = np.array([self._ascendant(t) for t in jd.tolist()])
+        error = np.abs(_wrap180(self.longitudes(jd) - truth)) * 3600
+        mismatches = int(np.count_nonzero(self.signs(jd) != np.floor(truth / 30) % 12 + 1))
+        return float(error.max()), mismatches
@@ -0,0 +1,13 @@
+import logging
+
+# Parent of every utils.* module logger
+PACKAGE_LOGGER = logging.getLogger(__name__.rpartition('.')[0])
+PACKAGE_LOGGER.addHandler(logging.NullHandler())
+
+
+def set_debug_tracing(enabled=True):
+    """Turn the calculation trace (Moon verification, every dasha period) on or off
+
+    Disabled tracing is skipped before any message is formatted.
+    """
+    PACKAGE_LOGGER.setLevel(logging.DEBUG if enabled else logging.INFO)
@@ -0,0 +1,103 @@
+"""Birth-time rectification sweeps over a window of candidate times
+
+One place is geocoded once; every candidate minute in the window then gets
+its planets (calculate_chart_arrays), lagna (the place's LagnaIndex), Moon
+nakshatra, Mahadasha start offsets and, for each life event, the dasha
+lords running at it, all as arrays with one row per candidate.
+"""
+from datetime import datetime
+from functools import lru_cache
+import heapq
+import numpy as np
+import pytz
+from .astro_constants import PLANET_ORDER
+from .calculations import calculate_chart_arrays
+from .dasha_timeline import NAKSHATRA_LENGTH, datetime_to_jd, mahadasha_offsets, vimshottari_lords
+from .geo_utils import get_geo_details
+from .lagna_index import LagnaIndex
+
+CHUNK_MINUTES = 240  # candidates per streamed batch
+_MOON = PLANET_ORDER.index('Moon')
+
+
+@lru_cache(maxsize=32)
+def get_lagna_index(lat, lon):
+    """Shared LagnaIndex per place"""
+    return LagnaIndex(lat, lon)
+
+
+def _to_jd(value, tz):
+    """Julian day (UT) of a jd, an aware datetime, a naive local datetime or 'DD-MM-YYYY HH:MM AM/PM'"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.strptime(value, "%d-%m-%Y %I:%M %p")
+    if value.tzinfo is None:
+        value = tz.localize(value)
+    return datetime_to_jd(value)
+
+
+def candidate_times(start_jd, end_jd, step_minutes=1):
+    """Julian days from start_jd to end_jd inclusive, every step_minutes"""
+    count = int(np.floor((end_jd - start_jd) * 1440 / step_minutes + 1e-9)) + 1
+    return start_jd + np.arange(count) * (step_minutes / 1440)
+
+
+def sweep_arrays(jd, lat, lon, event_jd=(), depth=3, lagna_index=None):
+    """Chart arrays for candidate Julian days at one place, plus rectification columns
+
+    Adds to calculate_chart_arrays: 'ascendant_degree' (degree of the
+    ascendant in its sign), 'moon_longitude', 'nakshatra' (1-27), 'pada'
+    (1-4), 'dasha_lord' / 'dasha_start_offset' (see mahadasha_offsets),
+    'event_jd' and 'event_lords' (candidates x events x depth, DASHA_ORDER
+    indices of the lords running at each event).
+    """
+    lagna_index = lagna_index or get_lagna_index(round(lat, 4), round(lon, 4))
+    jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+    result = calculate_chart_arrays(jd, lat, lon, lagna_index=lagna_index)
+
+    moon = result['position'][:, _MOON]
+    quarter = (moon // (NAKSHATRA_LENGTH / 4)).astype(np.int64)
+    result['ascendant_degree'] = lagna_index.degrees(jd)
+    result['moon_longitude'] = moon
+    result['nakshatra'] = (quarter // 4 + 1).astype(np.int8)
+    result['pada'] = (quarter % 4 + 1).astype(np.int8)
+    result['dasha_lord'], result['dasha_start_offset'] = mahadasha_offsets(moon)
+    result['event_jd'] = np.asarray(event_jd, dtype=np.float64).reshape(-1)
+    result['event_lords'] = vimshottari_lords(jd, moon, result['event_jd'], depth)
+    return result
+
+
+def iter_rectification(pob, start, end, step_minutes=1, events=(), depth=3, chunk_minutes=CHUNK_MINUTES):
+    """Stream sweep_arrays batches over the window [start, end] at pob
+
+    start, end and events are datetimes (naive ones are local to pob),
+    'DD-MM-YYYY HH:MM AM/PM' strings or Julian days.
+    """
+    geo = get_geo_details(pob)
+    tz = pytz.timezone(geo['tz'])
+    jd = candidate_times(_to_jd(start, tz), _to_jd(end, tz), step_minutes)
+    event_jd = [_to_jd(event, tz) for event in events]
+    lagna_index = get_lagna_index(round(geo['lat'], 4), round(geo['lon'], 4))
+
+    size = max(1, int(chunk_minutes / step_minutes))
+    for first in range(0, len(jd), size):
+        yield sweep_arrays(jd[first:first + size], geo['lat'], geo['lon'], event_jd, depth, lagna_index)
+
+
+def rectify(pob, start, end, score, step_minutes=1, events=(), depth=3, top=10):
+    """Best `top` (score, jd) candidates in the window, highest score first
+
+    score(batch) gets each sweep_arrays batch and returns one score per
+    candidate row; batches are discarded once scored.
+    """
+    best = []
+    for batch in iter_rectification(pob, start, end, step_minutes, events, depth):
+        scores = np.asarray(score(batch), dtype=np.float64)
+        if len(scores) != len(batch['jd']):
+            raise ValueError(f"score returned {len(scores)} values for {len(batch['jd'])} candidates")
+        for i in np.argsort(scores)[::-1][:top].tolist():
+            heapq.heappush(best, (float(scores[i]), float(batch['jd'][i])))
+            if len(best) > top:
+                heapq.heappop(best)
+    return sorted(best, reverse=True)
@@ -0,0 +1,170 @@
+"""Transit event search: sign ingresses, stations and aspect crossings
+
+Each planet is sampled once on a coarse grid (SCAN_STEPS), short enough
+that it cannot cross a whole sign or station twice between samples. The
+grid is split at every station so the planet moves one way along each
+segment; a segment then brackets at most one crossing of any longitude,
+found to within a second by false position (Illinois) root-finding.
+"""
+import swisseph as swe
+from collections import namedtuple
+from .astro_constants import PLANET_ORDER
+from .ephemeris import PLANET_BODIES, calc_body
+
+SECOND = 1 / 86400
+
+# Coarse scan step in days: under 30° of motion and shorter than any
+# retrograde or direct spell of the planet
+SCAN_STEPS = {
+    'Sun': 10, 'Moon': 1, 'Mars': 10, 'Mercury': 5, 'Jupiter': 30,
+    'Venus': 10, 'Saturn': 40, 'Rahu': 60, 'Ketu': 60
+}
+
+# Vedic full aspects: degrees ahead of the planet that it aspects
+VEDIC_ASPECTS = {planet: (0, 180) for planet in PLANET_ORDER}
+VEDIC_ASPECTS.update({'Mars': (0, 90, 180, 210), 'Jupiter': (0, 120, 180, 240), 'Saturn': (0, 60, 180, 270)})
+
+# kind is 'ingress' (detail: sign entered, 1-12), 'station' (detail:
+# 'retrograde' or 'direct') or 'aspect' (detail: (angle, target longitude))
+TransitEvent = namedtuple('TransitEvent', ['jd', 'planet', 'kind', 'detail'])
+
+
+def _wrap180(degrees):
+    return (degrees + 180) % 360 - 180
+
+
+def _by_time(event):
+    return event.jd
+
+
+def find_root(f, a, b, fa, fb, tol=SECOND):
+    """Zero of f in [a, b] given fa, fb of opposite sign (Illinois false position)"""
+    side = 0
+    while b - a > tol:
+        c = (a * fb - b * fa) / (fb - fa)
+        if not a < c < b:
+            c = (a + b) / 2
+        fc = f(c)
+        if fc == 0:
+            return c
+        if (fc > 0) == (fb > 0):
+            b, fb = c, fc
+            if side == -1:
+                fa /= 2
+            side = -1
+        else:
+            a, fa = c, fc
+            if side == 1:
+                fb /= 2
+            side = 1
+    return (a + b) / 2
+
+
+class PlanetScan:
+    """Coarse samples of one planet over [start_jd, end_jd], shared by all event searches"""
+
+    def __init__(self, planet, start_jd, end_jd, step=None):
+        self.planet = planet
+        self.body = PLANET_BODIES['Rahu' if planet == 'Ketu' else planet]
+        self.offset = 180 if planet == 'Ketu' else 0
+        self.calls = 0
+        step = step or SCAN_STEPS[planet]
+        count = max(1, int((end_jd - start_jd) / step))
+        self.times = [start_jd + (end_jd - start_jd) * i / count for i in range(count + 1)]
+        samples = [self.sample(jd) for jd in self.times]
+        self.longitudes = [lon for lon, _ in samples]
+        self.speeds = [speed for _, speed in samples]
+        self._stations = None
+        self._segment_cache = None
+
+    def sample(self, jd):
+        """Sidereal longitude and (tropical) daily speed, one calc_ut call"""
+        self.calls += 1
+        lon, speed = calc_body(jd, self.body)
+        return (lon - swe.get_ayanamsa(jd) + self.offset) % 360, speed
+
+    def longitude(self, jd):
+        return self.sample(jd)[0]
+
+    def speed(self, jd):
+        return self.sample(jd)[1]
+
+    def stations(self):
+        """Instants where the speed changes sign"""
+        if self._stations is None:
+            self._stations = []
+            for i in range(len(self.times) - 1):
+                v0, v1 = self.speeds[i], self.speeds[i + 1]
+                if (v0 < 0) != (v1 < 0):
+                    jd = find_root(self.speed, self.times[i], self.times[i + 1], v0, v1)
+                    self._stations.append(TransitEvent(jd, self.planet, 'station',
+                                                       'retrograde' if v0 > 0 else 'direct'))
+        return self._stations
+
+    def _segments(self):
+        """(t0, lon0, t1, lon1) pieces of the grid along which motion is one-way"""
+        if self._segment_cache is None:
+            points = list(zip(self.times, self.longitudes))
+            points += [(event.jd, self.longitude(event.jd)) for event in self.stations()]
+            points.sort()
+            self._segment_cache = [(t0, l0, t1, l1) for (t0, l0), (t1, l1) in zip(points, points[1:])]
+        return self._segment_cache
+
+    def _crossings(self, target):
+        """(jd, moving forward) for each pass of the sidereal longitude over target"""
+        f = lambda jd: _wrap180(self.longitude(jd) - target)
+        for t0, l0, t1, l1 in self._segments():
+            f0, f1 = _wrap180(l0 - target), _wrap180(l1 - target)
+            # A sign change across the +-180 seam is the far side, not a crossing
+            if (f0 < 0) != (f1 < 0) and abs(f1 - f0) < 180:
+                yield find_root(f, t0, t1, f0, f1), f1 > f0
+
+    def crossings(self, target, kind='aspect', detail=None):
+        """Instants where the sidereal longitude passes `target` degrees"""
+        return [TransitEvent(jd, self.planet, kind, detail) for jd, _ in self._crossings(target)]
+
+    def ingresses(self):
+        events = []
+        for boundary in range(0, 360, 30):
+            for jd, forward in self._crossings(boundary):
+                sign = boundary // 30 + 1 if forward else (boundary // 30 - 1) % 12 + 1
+                events.append(TransitEvent(jd, self.planet, 'ingress', sign))
+        return sorted(events, key=_by_time)
+
+    def aspects(self, target_longitude, angles=None):
+        """Instants where the planet's aspect at each angle falls exactly on target_longitude"""
+        angles = VEDIC_ASPECTS[self.planet] if angles is None else angles
+        events = []
+        for angle in angles:
+            events += self.crossings((target_longitude - angle) % 360, 'aspect', (angle, target_longitude))
+        return sorted(events, key=_by_time)
+
+
+def ingresses(planet, start_jd, end_jd):
+    """Sign ingresses of a planet between two Julian days (UT)"""
+    return PlanetScan(planet, start_jd, end_jd).ingresses()
+
+
+def stations(planet, start_jd, end_jd):
+    """Retrograde and direct stations of a planet between two Julian days (UT)"""
+    return PlanetScan(planet, start_jd, end_jd).stations()
+
+
+def aspect_crossings(planet, target_longitude, start_jd, end_jd, angles=(0,)):
+    """Exact conjunctions (angle 0) or aspects of a planet to a fixed sidereal longitude"""
+    return PlanetScan(planet, start_jd, end_jd).aspects(target_longitude, angles)
+
+
+def transit_events(start_jd, end_jd, planets=None, natal=None, angles=None):
+    """All ingresses, stations and (given natal {name: longitude}) aspects, in time order
+
+    angles=None uses each planet's VEDIC_ASPECTS; pass (0,) for conjunctions only.
+    Aspect details name the natal point: (angle, name).
+    """
+    events = []
+    for planet in planets or PLANET_ORDER:
+        scan = PlanetScan(planet, start_jd, end_jd)
+        events += scan.ingresses() + scan.stations()
+        for name, longitude in (natal or {}).items():
+            events += [event._replace(detail=(event.detail[0], name)) for event in scan.aspects(longitude, angles)]
+    return sorted(events, key=_by_time)
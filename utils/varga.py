@@ -0,0 +1,129 @@
+"""Divisional (varga) charts in bulk from sidereal longitudes
+
+Each longitude is turned once into its rasi and an integer offset within
+the sign (hundredths of an arc-second); every varga is then integer
+arithmetic on those two arrays. Equal-part vargas follow Parashara as a
+start sign and a step per rasi, so part p of rasi s falls in
+(start[s] + step[s] * p) % 12. Trimsamsa (D30) has unequal parts and uses
+its own degree table.
+"""
+import numpy as np
+from .astro_constants import PLANET_ORDER
+from .compact_chart import CHART_DTYPE
+
+# Shodashavarga: the sixteen divisional charts of Parashara
+SHODASHAVARGA = (1, 2, 3, 4, 7, 9, 10, 12, 16, 20, 24, 27, 30, 40, 45, 60)
+VARGA_NAMES = {
+    1: 'Rasi', 2: 'Hora', 3: 'Drekkana', 4: 'Chaturthamsa', 7: 'Saptamsa',
+    9: 'Navamsa', 10: 'Dasamsa', 12: 'Dwadasamsa', 16: 'Shodasamsa',
+    20: 'Vimsamsa', 24: 'Chaturvimsamsa', 27: 'Bhamsa', 30: 'Trimsamsa',
+    40: 'Khavedamsa', 45: 'Akshavedamsa', 60: 'Shashtiamsa'
+}
+
+_UNITS_PER_SIGN = 30 * 3600 * 100  # fits int32 even multiplied by 60
+
+_RASI = np.arange(12)
+_ODD = _RASI % 2 == 0  # Mesha, Mithuna, ... are the odd signs
+_QUALITY = _RASI % 3   # 0 movable, 1 fixed, 2 dual
+
+
+def _rule(start, step=1):
+    return (np.broadcast_to(start, (12,)) % 12).astype(np.int32), np.broadcast_to(step, (12,)).astype(np.int32)
+
+
+# division -> (start sign index, step) for each rasi, signs counted from Mesha = 0
+_EQUAL_RULES = {
+    1: _rule(_RASI, 0),
+    2: _rule(np.where(_ODD, 4, 3), np.where(_ODD, -1, 1)),  # Sun's hora (Simha) first in odd signs
+    3: _rule(_RASI, 4),
+    4: _rule(_RASI, 3),
+    7: _rule(np.where(_ODD, _RASI, _RASI + 6)),
+    9: _rule(_RASI * 9),  # from Mesha, Makara, Tula, Karka by element
+    10: _rule(np.where(_ODD, _RASI, _RASI + 8)),
+    12: _rule(_RASI),
+    16: _rule(np.array([0, 4, 8])[_QUALITY]),
+    20: _rule(np.array([0, 8, 4])[_QUALITY]),
+    24: _rule(np.where(_ODD, 4, 3)),
+    27: _rule(np.array([0, 3, 6, 9])[_RASI % 4]),
+    40: _rule(np.where(_ODD, 0, 6)),
+    45: _rule(np.array([0, 4, 8])[_QUALITY]),
+    60: _rule(_RASI),
+}
+
+# Trimsamsa: part boundaries (degrees) and the sign of each part
+_D30_BOUNDS = {True: [5, 10, 18, 25], False: [5, 12, 20, 25]}
+_D30_SIGNS = {True: [0, 10, 8, 2, 6], False: [1, 5, 11, 9, 7]}
+_D30_TABLE = np.array([
+    [_D30_SIGNS[odd][np.searchsorted(_D30_BOUNDS[odd], degree, side='right')] for degree in range(30)]
+    for odd in _ODD.tolist()
+], dtype=np.int8)  # (rasi, whole degree) -> sign index; all bounds are whole degrees
+
+
+def _rasi_and_offset(longitude):
+    """Rasi index (0-11) and integer offset within the sign of each longitude"""
+    units = np.floor(np.mod(np.asarray(longitude, dtype=np.float64), 360) * (_UNITS_PER_SIGN / 30)).astype(np.int64)
+    rasi, offset = np.divmod(units, _UNITS_PER_SIGN)
+    return np.minimum(rasi, 11).astype(np.intp), offset.astype(np.int32)
+
+
+def _varga_from(rasi, offset, division):
+    if division == 30:
+        return _D30_TABLE[rasi, offset // (_UNITS_PER_SIGN // 30)] + 1
+    if division not in _EQUAL_RULES:
+        raise ValueError(f"Unknown varga D{division}; expected one of {SHODASHAVARGA}")
+    start, step = _EQUAL_RULES[division]
+    part = offset * division // _UNITS_PER_SIGN
+    return ((start[rasi] + step[rasi] * part) % 12 + 1).astype(np.int8)
+
+
+def varga_signs(longitude, division):
+    """Sign (1-12) of each sidereal longitude in varga D`division`"""
+    rasi, offset = _rasi_and_offset(longitude)
+    return _varga_from(rasi, offset, division)
+
+
+def varga_table(longitude, divisions=SHODASHAVARGA):
+    """Varga signs with a trailing axis over `divisions`: shape longitude.shape + (len(divisions),)"""
+    rasi, offset = _rasi_and_offset(longitude)
+    table = np.empty(rasi.shape + (len(divisions),), dtype=np.int8)
+    for column, division in enumerate(divisions):
+        table[..., column] = _varga_from(rasi, offset, division)
+    return table
+
+
+def chart_vargas(chart, divisions=SHODASHAVARGA):
+    """{planet: {'D9': sign, ...}} for one calculate_vedic_chart result"""
+    longitude = [chart['planets'][name]['position'] for name in PLANET_ORDER]
+    table = varga_table(longitude, divisions).tolist()
+    return {name: {f"D{d}": sign for d, sign in zip(divisions, row)}
+            for name, row in zip(PLANET_ORDER, table)}
+
+
+def add_vargas(batch, divisions=SHODASHAVARGA):
+    """Add 'varga_sign' (charts x planets x divisions) and 'vargas' to calculate_chart_arrays output"""
+    batch['vargas'] = list(divisions)
+    batch['varga_sign'] = varga_table(batch['position'], divisions)
+    return batch
+
+
+def varga_dtype(divisions=SHODASHAVARGA):
+    """CHART_DTYPE extended with one 'd<N>' field of planet signs per varga"""
+    return np.dtype(CHART_DTYPE.descr + [(f"d{d}", 'i1', (len(PLANET_ORDER),)) for d in divisions])
+
+
+def records_with_vargas(records, divisions=SHODASHAVARGA, chunk=1 << 18):
+    """Copy of CHART_DTYPE records with the varga signs of each planet added
+
+    The lagna is not divided: records keep only its whole sign cusp, and
+    its vargas need the ascendant degree.
+    """
+    out = np.empty(len(records), dtype=varga_dtype(divisions))
+    for name in CHART_DTYPE.names:
+        out[name] = records[name]
+    # Chunked so the int64 intermediates stay small for millions of charts
+    for first in range(0, len(records), chunk):
+        rows = slice(first, first + chunk)
+        table = varga_table(records['position'][rows], divisions)
+        for column, division in enumerate(divisions):
+            out[f"d{division}"][rows] = table[..., column]
+    return out
@@ -0,0 +1,80 @@
+import math
+import numpy as np
+import faiss
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+
+# Defaults per index type; nlist is derived from the corpus size when None
+DEFAULT_INDEX_PARAMS = {
+    "flat": {},
+    "hnsw": {"M": 32, "efConstruction": 200, "efSearch": 64},
+    "ivf_flat": {"nlist": None, "nprobe": 16},
+    "ivf_pq": {"nlist": None, "nprobe": 16, "pq_m": 48, "pq_nbits": 8},
+}
+
+# FAISS wants about this many training points per centroid
+MIN_POINTS_PER_CENTROID = 39
+
+def default_nlist(n_vectors):
+    """~4*sqrt(n) inverted lists, capped so each gets enough training points"""
+    return max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // MIN_POINTS_PER_CENTROID))
+
+def resolve_index_params(index_type, n_vectors, dim, params=None):
+    """Complete parameter dict for an index type, as recorded in metadata.pkl"""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+    resolved = dict(DEFAULT_INDEX_PARAMS[index_type])
+    resolved.update(params or {})
+    if "nlist" in resolved and resolved["nlist"] is None:
+        resolved["nlist"] = default_nlist(n_vectors)
+    if index_type == "ivf_pq":
+        if dim % resolved["pq_m"]:
+            raise ValueError(f"pq_m={resolved['pq_m']} must divide the vector dimension {dim}")
+        # 2**nbits codebook entries each need training points too
+        max_bits = int(math.log2(max(2, n_vectors // MIN_POINTS_PER_CENTROID)))
+        resolved["pq_nbits"] = max(1, min(resolved["pq_nbits"], max_bits))
+    resolved["type"] = index_type
+    return resolved
+
+def apply_search_params(index, params):
+    """Set query-time knobs (nprobe, efSearch) on a built or loaded index"""
+    space = faiss.ParameterSpace()
+    if "nprobe" in params:
+        space.set_index_parameter(index, "nprobe", params["nprobe"])
+    if "efSearch" in params:
+        space.set_index_parameter(index, "efSearch", params["efSearch"])
+
+def build_index(embeddings, index_type="flat", params=None, train_size=50000, seed=0):
+    """Inner-product FAISS index over normalized embeddings, ids = row numbers
+
+    IVF indexes are trained on a random sample of at most train_size rows.
+    Returns (index, params) where params is the resolved parameter dict.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    n, dim = embeddings.shape
+    params = resolve_index_params(index_type, n, dim, params)
+
+    if index_type == "flat":
+        inner = faiss.IndexFlatIP(dim)
+    elif index_type == "hnsw":
+        inner = faiss.IndexHNSWFlat(dim, params["M"], faiss.METRIC_INNER_PRODUCT)
+        inner.hnsw.efConstruction = params["efConstruction"]
+    else:
+        quantizer = faiss.IndexFlatIP(dim)
+        if index_type == "ivf_flat":
+            inner = faiss.IndexIVFFlat(quantizer, dim, params["nlist"], faiss.METRIC_INNER_PRODUCT)
+        else:
+            inner = faiss.IndexIVFPQ(quantizer, dim, params["nlist"], params["pq_m"],
+                                     params["pq_nbits"], faiss.METRIC_INNER_PRODUCT)
+
+    if not inner.is_trained:
+        sample = embeddings
+        if n > train_size:
+            rows = np.random.default_rng(seed).choice(n, train_size, replace=False)
+            sample = embeddings[np.sort(rows)]
+        inner.train(sample)
+
+    index = faiss.IndexIDMap2(inner)
+    index.add_with_ids(embeddings, np.arange(n).astype('int64'))
+    apply_search_params(index, params)
+    return index, params